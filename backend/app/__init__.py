@@ -1,13 +1,27 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .config import get_config
 from .extensions import db, migrate, jwt, ma
 from .swagger import swagger_bp, api
+from .utils.search import register_search_index
+from .utils.cache import gallery_cache
+from .utils.catalog import register_catalog_version
+from .utils.identity import register_identity_cache
+from .utils.passwords import configure_password_hasher
+from .utils.rate_limit import configure_rate_limiter
+from .utils.background import background
+from .utils.outbox import outbox
+from .utils.cart_service import register_cart_summaries
+from .commands import cart_cli, outbox_cli
 
 def create_app(config_object=None):
     app = Flask(__name__)
     app.config.from_object(config_object or get_config())
 
+    if app.config['TRUSTED_PROXY_HOPS']:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_HOPS'])
+
     # Enable CORS
     CORS(app, origins=app.config['CORS_ORIGINS'], supports_credentials=True)
 
@@ -20,9 +34,35 @@ def create_app(config_object=None):
     jwt.init_app(app)
     ma.init_app(app)
 
+    # Maintain the artwork full-text search index
+    register_search_index()
+
+    # Version stamp behind gallery ETags and cache keys
+    register_catalog_version()
+
+    # Drop cached user identities when users change
+    register_identity_cache()
+
+    # Keep stored cart subtotals in step with artwork prices
+    register_cart_summaries()
+
+    configure_password_hasher(app)
+    configure_rate_limiter(app)
+    background.init_app(app)
+    outbox.init_app(app)
+
+    gallery_cache.configure(
+        maxsize=app.config['GALLERY_CACHE_SIZE'],
+        ttl=app.config['GALLERY_CACHE_TTL']
+    )
+
     # Register blueprints
     app.register_blueprint(swagger_bp, url_prefix='/api')
 
+    # Maintenance commands (`flask cart ...`, `flask outbox ...`)
+    app.cli.add_command(cart_cli)
+    app.cli.add_command(outbox_cli)
+
     # Configure JWT
     @jwt.user_identity_loader
     def user_identity_lookup(user):
@@ -30,19 +70,14 @@ def create_app(config_object=None):
             return user
         return str(user.id)
 
-    @jwt.user_lookup_loader
-    def user_lookup_callback(_jwt_header, jwt_data):
-        from .models.user import User
-        identity = jwt_data["sub"]
-        try:
-            return User.query.filter_by(id=identity).one_or_none()
-        except Exception:
-            return None
-
     # Health check endpoint
     @app.route('/health')
     def health_check():
-        return {'status': 'healthy', 'service': 'ArtMarket API'}
+        return {
+            'status': 'healthy',
+            'service': 'ArtMarket API',
+            'gallery_cache': gallery_cache.stats()
+        }
 
     # Database connection check endpoint
     @app.route('/db-check')
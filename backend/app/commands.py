@@ -0,0 +1,47 @@
+import sys
+import click
+from flask.cli import AppGroup
+from .extensions import db
+from .utils.cart_service import CartService
+from .utils.outbox import outbox
+# Registers the outbox handlers
+from .utils import notification_service  # noqa: F401
+
+cart_cli = AppGroup('cart', help='Cart maintenance')
+outbox_cli = AppGroup('outbox', help='Outbox delivery')
+
+
+@cart_cli.command('check-summaries')
+@click.option('--fix', is_flag=True, help='Recompute the drifted summaries from cart_items')
+@click.option('--limit', type=int, default=None, help='Stop after this many drifted carts')
+def check_summaries(fix, limit):
+    """Compare stored cart item counts and subtotals with their lines"""
+    drifted = CartService.summary_drift(limit)
+    for row in drifted:
+        click.echo(f'{row.id}: stored {row.item_count} / {row.subtotal}, '
+                   f'actual {row.actual_count} / {row.actual_subtotal}')
+    if not drifted:
+        click.echo('All cart summaries match their items')
+        return
+    if fix:
+        CartService.repair_summaries([row.id for row in drifted])
+        db.session.commit()
+        click.echo(f'Repaired {len(drifted)} cart(s)')
+    else:
+        click.echo(f'{len(drifted)} cart(s) out of date; rerun with --fix to repair')
+        sys.exit(1)
+
+
+@outbox_cli.command('drain')
+@click.option('--limit', type=int, default=None, help='Stop after this many messages')
+def drain_outbox(limit):
+    """Deliver every due outbox message once, then exit"""
+    click.echo(f'Delivered {outbox.drain(limit)} message(s)')
+
+
+@outbox_cli.command('work')
+@click.option('--poll-interval', type=float, default=None, help='Seconds between passes')
+def work_outbox(poll_interval):
+    """Deliver outbox messages continuously (for OUTBOX_WORKER=False deployments)"""
+    click.echo('Outbox worker started')
+    outbox.work(poll_interval)
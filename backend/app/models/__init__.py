@@ -1,11 +1,13 @@
 from .artwork import Artwork, ArtworkSchema
 from .user import User, UserSchema
-from .cart import Cart, CartItem, CartSchema, CartItemSchema
+from .cart import Cart, CartItem, CartItemRemoval, CartSchema, CartItemSchema
 from .wishlist import Wishlist, WishlistItem, WishlistSchema, WishlistItemSchema
 from .payment import Payment, PaymentSchema
 from .delivery import Delivery, DeliverySchema
 from .notification import Notification, NotificationSchema
 from .order import Order, OrderItem, OrderSchema, OrderItemSchema
+from .catalog import CatalogState
+from .outbox import OutboxMessage
 
 __all__ = [
     "Artwork",
@@ -14,6 +16,7 @@ __all__ = [
     "UserSchema",
     "Cart",
     "CartItem",
+    "CartItemRemoval",
     "CartSchema",
     "Wishlist",
     "WishlistItem",
@@ -24,4 +27,6 @@ __all__ = [
     "Payment",
     "Delivery",
     "Notification",
+    "CatalogState",
+    "OutboxMessage",
 ]
@@ -20,6 +20,13 @@ class Artwork(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_artworks_available_created', 'is_available', 'created_at'),
+        db.Index('ix_artworks_available_price', 'is_available', 'price'),
+        db.Index('ix_artworks_updated_id', 'updated_at', 'id'),
+        db.Index('ix_artworks_artist_id', 'artist_id'),
+    )
+
 
 class ArtworkSchema(ma.SQLAlchemyAutoSchema):
     created_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
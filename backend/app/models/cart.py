@@ -1,18 +1,29 @@
 from datetime import datetime
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
+from marshmallow import pre_dump
 from ..extensions import db, ma
+from ..utils.artwork_loader import artwork_loader
 
 class Cart(db.Model):
     __tablename__ = "carts"
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), nullable=False)
+    # Denormalized from cart_items for the header badge; see CartService.refresh_summary
+    item_count = db.Column(db.Integer, default=0, nullable=False)
+    subtotal = db.Column(db.Numeric(12, 2), default=0, nullable=False)
+    # Bumped by every change to the cart's lines; see CartService.claim_version
+    version = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     items = db.relationship("CartItem", backref="cart", lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', name='uq_carts_user_id'),
+    )
+
 class CartItem(db.Model):
     __tablename__ = "cart_items"
 
@@ -21,21 +32,47 @@ class CartItem(db.Model):
     artwork_id = db.Column(UUID(as_uuid=True), db.ForeignKey("artworks.id"), nullable=False)
     quantity = db.Column(db.Integer, default=1)
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Cart version at which this line last changed
+    version = db.Column(db.Integer, default=0, nullable=False)
 
     artwork = db.relationship("Artwork")
 
+    __table_args__ = (
+        db.UniqueConstraint('cart_id', 'artwork_id', name='uq_cart_items_cart_artwork'),
+    )
+
+class CartItemRemoval(db.Model):
+    """Tombstone for a removed cart line, so deltas can report the removal"""
+    __tablename__ = "cart_item_removals"
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    cart_id = db.Column(UUID(as_uuid=True), db.ForeignKey("carts.id"), nullable=False)
+    artwork_id = db.Column(UUID(as_uuid=True), db.ForeignKey("artworks.id"), nullable=False)
+    # Cart version at which the line was removed
+    version = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('cart_id', 'artwork_id', name='uq_cart_item_removals_cart_artwork'),
+    )
+
 class CartItemSchema(ma.SQLAlchemyAutoSchema):
     artwork = ma.Method('get_artwork_data', dump_only=True)
+
+    @pre_dump(pass_collection=True)
+    def prime_artworks(self, data, many, **kwargs):
+        artwork_loader().prime(item.artwork_id for item in (data if many else [data]))
+        return data
     
     def get_artwork_data(self, obj):
-        if obj.artwork:
+        artwork = artwork_loader().get(obj.artwork_id)
+        if artwork:
             return {
-                'id': str(obj.artwork.id),
-                'title': obj.artwork.title,
-                'price': float(obj.artwork.price) if obj.artwork.price else 0,
-                'image_url': obj.artwork.image_url,
-                'category': obj.artwork.category,
-                'artist': obj.artwork.artist.full_name if obj.artwork.artist else 'Unknown Artist'
+                'id': str(artwork.id),
+                'title': artwork.title,
+                'price': float(artwork.price) if artwork.price else 0,
+                'image_url': artwork.image_url,
+                'category': artwork.category,
+                'artist': artwork.artist_name if artwork.artist_name is not None else 'Unknown Artist'
             }
         return None
 
@@ -48,6 +85,10 @@ class CartSchema(ma.SQLAlchemyAutoSchema):
     items = ma.Nested(CartItemSchema, many=True)
     created_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
     updated_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
+    subtotal = ma.Method("get_subtotal")
+
+    def get_subtotal(self, obj):
+        return float(obj.subtotal) if obj.subtotal is not None else None
 
     class Meta:
         model = Cart
@@ -0,0 +1,14 @@
+from datetime import datetime
+from ..extensions import db
+
+class CatalogState(db.Model):
+    """Single-row stamp bumped by every artwork write.
+
+    Gallery list ETags and cache keys are derived from `version`, so every
+    worker sees a write as soon as it commits.
+    """
+    __tablename__ = "catalog_state"
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
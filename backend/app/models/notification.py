@@ -14,6 +14,10 @@ class Notification(db.Model):
     read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_notifications_user_created', 'user_id', 'created_at'),
+    )
+
 class NotificationSchema(ma.SQLAlchemyAutoSchema):
     created_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
 
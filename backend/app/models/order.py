@@ -2,7 +2,12 @@ from datetime import datetime
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy import CheckConstraint
+from marshmallow import pre_dump
 from ..extensions import db, ma
+from ..utils.artwork_loader import artwork_loader
+from .artwork import ArtworkSchema
+from .payment import PaymentSchema
+from .delivery import DeliverySchema
 
 
 class Order(db.Model):
@@ -25,6 +30,7 @@ class Order(db.Model):
 
     __table_args__ = (
         CheckConstraint(status.in_(['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled'])),
+        db.Index('ix_orders_customer_created', 'customer_id', 'created_at'),
     )
 
 
@@ -39,10 +45,27 @@ class OrderItem(db.Model):
 
     artwork = db.relationship("Artwork")
 
+    __table_args__ = (
+        db.Index('ix_order_items_order_id', 'order_id'),
+        db.Index('ix_order_items_artwork_id', 'artwork_id'),
+    )
+
+
+line_artwork_schema = ArtworkSchema(exclude=('artist',))
+
 
 class OrderItemSchema(ma.SQLAlchemyAutoSchema):
     price = ma.Method("get_price")
-    artwork = ma.Nested(lambda: ArtworkSchema(exclude=('artist',)), dump_only=True)
+    artwork = ma.Method("get_artwork", dump_only=True)
+
+    @pre_dump(pass_collection=True)
+    def prime_artworks(self, data, many, **kwargs):
+        artwork_loader().prime(item.artwork_id for item in (data if many else [data]))
+        return data
+
+    def get_artwork(self, obj):
+        artwork = artwork_loader().get(obj.artwork_id)
+        return line_artwork_schema.dump(artwork) if artwork is not None else None
 
     def get_price(self, obj):
         return float(obj.price) if obj.price is not None else None
@@ -55,12 +78,20 @@ class OrderItemSchema(ma.SQLAlchemyAutoSchema):
 
 class OrderSchema(ma.SQLAlchemyAutoSchema):
     items = ma.Nested(OrderItemSchema, many=True)
-    payments = ma.Nested(lambda: PaymentSchema(many=True, exclude=('order',)), dump_only=True)
-    deliveries = ma.Nested(lambda: DeliverySchema(many=True, exclude=('order',)), dump_only=True)
+    payments = ma.Nested(lambda: PaymentSchema(many=True), dump_only=True)
+    deliveries = ma.Nested(lambda: DeliverySchema(many=True), dump_only=True)
     created_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
     updated_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
     total_amount = ma.Method("get_total_amount")
 
+    @pre_dump(pass_collection=True)
+    def prime_artworks(self, data, many, **kwargs):
+        # One artwork query for a whole page of orders, not one per order
+        artwork_loader().prime(
+            item.artwork_id for order in (data if many else [data]) for item in order.items
+        )
+        return data
+
     def get_total_amount(self, obj):
         return float(obj.total_amount) if obj.total_amount is not None else None
 
@@ -0,0 +1,26 @@
+from datetime import datetime
+import uuid
+from sqlalchemy.dialects.postgresql import UUID
+from ..extensions import db
+
+class OutboxMessage(db.Model):
+    """A side effect recorded in the transaction that caused it.
+
+    The dispatcher in app/utils/outbox.py delivers pending messages after
+    commit and retries failures with backoff.
+    """
+    __tablename__ = "outbox_messages"
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    topic = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_outbox_messages_status_available', 'status', 'available_at'),
+    )
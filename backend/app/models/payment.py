@@ -15,6 +15,10 @@ class Payment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        db.Index('ix_payments_order_id', 'order_id'),
+    )
+
 class PaymentSchema(ma.SQLAlchemyAutoSchema):
     created_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
     updated_at = ma.DateTime(format='%Y-%m-%dT%H:%M:%S')
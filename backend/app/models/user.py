@@ -1,9 +1,9 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from marshmallow import fields
 from ..extensions import db, ma
+from ..utils.passwords import password_hasher
 
 
 class User(db.Model):
@@ -26,10 +26,14 @@ class User(db.Model):
 
     # --- Password methods ---
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self) -> bool:
+        """True when the stored hash predates the configured hashing policy"""
+        return password_hasher.needs_rehash(self.password_hash)
 
 
 # --- Marshmallow Schema ---
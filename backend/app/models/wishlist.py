@@ -1,7 +1,9 @@
 from datetime import datetime
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
+from marshmallow import pre_dump
 from ..extensions import db, ma
+from ..utils.artwork_loader import artwork_loader
 
 class Wishlist(db.Model):
     __tablename__ = "wishlists"
@@ -13,6 +15,10 @@ class Wishlist(db.Model):
 
     items = db.relationship("WishlistItem", backref="wishlist", lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.UniqueConstraint('user_id', name='uq_wishlists_user_id'),
+    )
+
 class WishlistItem(db.Model):
     __tablename__ = "wishlist_items"
 
@@ -23,19 +29,29 @@ class WishlistItem(db.Model):
 
     artwork = db.relationship("Artwork")
 
+    __table_args__ = (
+        db.UniqueConstraint('wishlist_id', 'artwork_id', name='uq_wishlist_items_wishlist_artwork'),
+    )
+
 class WishlistItemSchema(ma.SQLAlchemyAutoSchema):
     artwork = ma.Method('get_artwork_data', dump_only=True)
+
+    @pre_dump(pass_collection=True)
+    def prime_artworks(self, data, many, **kwargs):
+        artwork_loader().prime(item.artwork_id for item in (data if many else [data]))
+        return data
     
     def get_artwork_data(self, obj):
-        if obj.artwork:
+        artwork = artwork_loader().get(obj.artwork_id)
+        if artwork:
             return {
-                'id': str(obj.artwork.id),
-                'title': obj.artwork.title,
-                'price': float(obj.artwork.price) if obj.artwork.price else 0,
-                'image_url': obj.artwork.image_url,
-                'category': obj.artwork.category,
-                'description': obj.artwork.description,
-                'artist': obj.artwork.artist.full_name if obj.artwork.artist else 'Unknown Artist'
+                'id': str(artwork.id),
+                'title': artwork.title,
+                'price': float(artwork.price) if artwork.price else 0,
+                'image_url': artwork.image_url,
+                'category': artwork.category,
+                'description': artwork.description,
+                'artist': artwork.artist_name if artwork.artist_name is not None else 'Unknown Artist'
             }
         return None
 
@@ -3,8 +3,9 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.artwork import Artwork, ArtworkSchema
-from app.models.user import User
 from app.utils.decorators import handle_api_errors
+from app.utils.identity import current_identity
+from app.utils.cache import invalidate_artwork_cache
 import uuid
 
 artwork_schema = ArtworkSchema()
@@ -15,9 +16,9 @@ class ArtistArtworkResource(Resource):
     @handle_api_errors
     def get(self):
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        identity = current_identity()
         
-        if not user or user.role != 'artist':
+        if not identity or identity.role != 'artist':
             return {'message': 'Access denied'}, 403
         
         artworks = Artwork.query.filter_by(artist_id=user_id).all()
@@ -29,9 +30,9 @@ class ArtistArtworkResource(Resource):
     @handle_api_errors
     def post(self):
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        identity = current_identity()
         
-        if not user or user.role != 'artist':
+        if not identity or identity.role != 'artist':
             return {'message': 'Access denied'}, 403
         
         data = request.get_json()
@@ -47,6 +48,7 @@ class ArtistArtworkResource(Resource):
         
         db.session.add(artwork)
         db.session.commit()
+        invalidate_artwork_cache(artwork)
         
         return artwork_schema.dump(artwork), 201
 
@@ -55,9 +57,9 @@ class ArtistArtworkDetailResource(Resource):
     @handle_api_errors
     def get(self, artwork_id):
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        identity = current_identity()
         
-        if not user or user.role != 'artist':
+        if not identity or identity.role != 'artist':
             return {'message': 'Access denied'}, 403
         
         try:
@@ -75,9 +77,9 @@ class ArtistArtworkDetailResource(Resource):
     @handle_api_errors
     def put(self, artwork_id):
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        identity = current_identity()
         
-        if not user or user.role != 'artist':
+        if not identity or identity.role != 'artist':
             return {'message': 'Access denied'}, 403
         
         try:
@@ -90,6 +92,7 @@ class ArtistArtworkDetailResource(Resource):
             return {'message': 'Artwork not found'}, 404
         
         data = request.get_json()
+        previous_category = artwork.category
         
         artwork.title = data.get('title', artwork.title)
         artwork.description = data.get('description', artwork.description)
@@ -98,6 +101,7 @@ class ArtistArtworkDetailResource(Resource):
         artwork.image_url = data.get('image_url', artwork.image_url)
         
         db.session.commit()
+        invalidate_artwork_cache(artwork, previous_category)
         
         return artwork_schema.dump(artwork), 200
 
@@ -105,9 +109,9 @@ class ArtistArtworkDetailResource(Resource):
     @handle_api_errors
     def delete(self, artwork_id):
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        identity = current_identity()
         
-        if not user or user.role != 'artist':
+        if not identity or identity.role != 'artist':
             return {'message': 'Access denied'}, 403
         
         try:
@@ -121,5 +125,6 @@ class ArtistArtworkDetailResource(Resource):
         
         db.session.delete(artwork)
         db.session.commit()
+        invalidate_artwork_cache(artwork)
         
         return {'message': 'Artwork deleted successfully'}, 200
\ No newline at end of file
@@ -2,11 +2,15 @@ from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import create_access_token
 from marshmallow import ValidationError
+from sqlalchemy.exc import IntegrityError
 from ..extensions import db
 from ..models.user import User, UserSchema
 from ..utils.decorators import handle_api_errors
 from ..utils.validators import validate_email, validate_password
 from ..utils.notification_service import NotificationService
+from ..utils.identity import identity_claims
+from ..utils.passwords import HashingUnavailable
+from ..utils.rate_limit import rate_limiter, too_many_attempts
 
 user_schema = UserSchema()
 
@@ -29,12 +33,12 @@ class RegisterResource(Resource):
             if not validate_password(data['password']):
                 return {"message": "Password must be at least 8 characters with uppercase, lowercase, and numbers"}, 400
 
-            # Check for existing user
-            existing_user = User.query.filter_by(email=data['email']).first()
-            if existing_user:
-                return {"message": "User with this email already exists"}, 409
+            # Admission control before any hashing or user lookup
+            decision = rate_limiter.hit('register', ip=request.remote_addr)
+            if not decision.allowed:
+                return too_many_attempts(decision)
 
-            # Create new user
+            # Create new user; the unique constraints catch duplicates
             user = User(
                 username=data['email'].split('@')[0],
                 email=data['email'],
@@ -44,20 +48,33 @@ class RegisterResource(Resource):
             user.set_password(data['password'])
 
             db.session.add(user)
+            try:
+                db.session.flush()
+            except IntegrityError:
+                db.session.rollback()
+                if User.query.filter_by(email=data['email']).first():
+                    return {"message": "User with this email already exists"}, 409
+                return {"message": "An account with this username already exists"}, 409
+
+            # Serialize before commit so no reload of the new row is needed
+            user_id = user.id
+            user_data = user_schema.dump(user)
+            access_token = create_access_token(identity=str(user_id), additional_claims=identity_claims(user))
+
+            # Welcome notification and email are delivered from the outbox after commit
+            NotificationService.enqueue_welcome(user_id, data['email'], data['fullName'], data['role'])
             db.session.commit()
-            
-            # Send welcome notification
-            NotificationService.notify_welcome(user.id, user.role)
-
-            # Create JWT token (convert UUID to string)
-            access_token = create_access_token(identity=str(user.id))
 
             return {
-                "user": user_schema.dump(user),
+                "user": user_data,
                 "access_token": access_token,
                 "message": "Account created successfully"
             }, 201
 
+        except HashingUnavailable:
+            db.session.rollback()
+            return {"message": "Too many sign-up attempts in progress, please retry"}, 503, {"Retry-After": "1"}
+
         except Exception as e:
             db.session.rollback()
             return {"message": f"Registration failed: {str(e)}"}, 500
@@ -71,6 +88,12 @@ class LoginResource(Resource):
             if not data.get('email') or not data.get('password'):
                 return {"message": "Email and password are required"}, 400
 
+            # Admission control before any hashing or user lookup
+            email_key = data['email'].strip().lower()
+            decision = rate_limiter.hit('login', email=email_key, ip=request.remote_addr)
+            if not decision.allowed:
+                return too_many_attempts(decision)
+
             # ✅ Query for a user object, not a UUID
             user = User.query.filter_by(email=data['email'], is_active=True).first()
 
@@ -78,8 +101,16 @@ class LoginResource(Resource):
             if not user or not user.check_password(data['password']):
                 return {"message": "Invalid email or password"}, 401
 
+            # A successful login clears earlier failures for this account
+            rate_limiter.reset('login', 'email', email_key)
+
+            # Move hashes made under an older policy to the current one
+            if user.password_needs_rehash():
+                user.set_password(data['password'])
+                db.session.commit()
+
             # ✅ This line is the key fix
-            access_token = create_access_token(identity=str(user.id))
+            access_token = create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
 
             return {
                 "user": user_schema.dump(user),
@@ -87,6 +118,9 @@ class LoginResource(Resource):
                 "message": "Login successful"
             }, 200
 
+        except HashingUnavailable:
+            return {"message": "Too many sign-in attempts in progress, please retry"}, 503, {"Retry-After": "1"}
+
         except Exception as e:
             print(f"Login error: {e}")
             return {"message": f"Login failed: {str(e)}"}, 500
\ No newline at end of file
@@ -1,34 +1,88 @@
-from flask import request
+from functools import wraps
+from flask import request, Response
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from marshmallow import ValidationError
+from flask_jwt_extended import jwt_required
 from ..extensions import db
-from ..models.cart import Cart, CartItem, CartSchema
-from ..models.artwork import Artwork
-from ..models.user import User
 from ..utils.decorators import handle_api_errors
+from ..utils.identity import current_user_id
 from ..utils.notification_service import NotificationService
+from ..utils.serializers import serialize_cart, serialize_cart_changes
+from ..utils.cart_service import CartService, CartConflict, cart_etag, parse_cart_etag, ONE_OF_A_KIND
+from ..utils.background import background
+from ..utils.http_cache import is_not_modified
 
-cart_schema = CartSchema()
+# Cart payloads carry the cart version as their ETag. Reads take
+# `?since_version=N` to get only the lines changed after N (plus removed
+# artwork ids) and If-None-Match for a 304. Writes take If-Match to apply
+# only on that version, answering 412 if another edit got there first;
+# their response is then the delta from the If-Match version.
+
+def cart_headers(version):
+    return {'ETag': cart_etag(version), 'Cache-Control': 'private, no-cache'}
+
+def since_version_arg(default=None):
+    value = request.args.get('since_version')
+    if value is None:
+        return default
+    if not value.isdigit():
+        raise ValueError('since_version must be a non-negative integer')
+    return int(value)
+
+def expected_version_header():
+    """Cart version named by If-Match, or None for an unconditional edit"""
+    value = request.headers.get('If-Match')
+    if value is None or value.strip() == '*':
+        return None
+    version = parse_cart_etag(value)
+    if version is None:
+        raise ValueError('If-Match must be an ETag returned by the cart API')
+    return version
+
+def cart_response(user_id, since_version=None, status=200):
+    """The cart, or only its changes when the client has `since_version`"""
+    if since_version is not None:
+        cart, items, removed = CartService.load_changes(user_id, since_version)
+        cart = cart or CartService.empty_cart(user_id)
+        if since_version <= cart.version:
+            return serialize_cart_changes(cart, since_version, items, removed), status, cart_headers(cart.version)
+    cart = CartService.load_cart(user_id) or CartService.empty_cart(user_id)
+    return serialize_cart(cart), status, cart_headers(cart.version)
+
+def detect_conflicts(fn):
+    """Answer 412 with the current version when an If-Match edit lost the race"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except CartConflict as conflict:
+            db.session.rollback()
+            return (
+                {"message": "Cart has changed since the given version", "version": conflict.version},
+                412,
+                cart_headers(conflict.version)
+            )
+    return wrapper
 
 class CartResource(Resource):
     @jwt_required()
     @handle_api_errors
     def get(self):
-        user_id = get_jwt_identity()
-        cart = Cart.query.filter_by(user_id=user_id).first()
+        user_id = current_user_id()
+        since_version = since_version_arg()
         
-        if not cart:
-            cart = Cart(user_id=user_id)
-            db.session.add(cart)
-            db.session.commit()
+        # Version check first: an unchanged cart costs one row read
+        version = CartService.summary(user_id).version
+        if is_not_modified(cart_etag(version)):
+            return Response(status=304, headers=cart_headers(version))
         
-        return cart_schema.dump(cart), 200
+        # Users without a cart see an empty one; it is stored on first add
+        return cart_response(user_id, since_version)
 
     @jwt_required()
     @handle_api_errors
+    @detect_conflicts
     def post(self):
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         data = request.get_json()
         
         artwork_id = data.get('artworkId')
@@ -37,71 +91,100 @@ class CartResource(Resource):
         if not artwork_id:
             return {"message": "artworkId is required"}, 400
         
-        # Verify artwork exists and is available
-        artwork = Artwork.query.filter_by(id=artwork_id, is_available=True).first()
-        if not artwork:
+        if quantity != 1 or isinstance(quantity, bool):
+            return {"message": ONE_OF_A_KIND}, 400
+        
+        expected_version = expected_version_header()
+        since_version = since_version_arg(expected_version)
+        
+        # Availability check and insert in one statement; adding it again is a no-op
+        added = CartService.add_item(user_id, artwork_id, expected_version)
+        if added is None:
+            db.session.rollback()
             return {"message": "Artwork not found or unavailable"}, 404
         
-        # Get or create cart
-        cart = Cart.query.filter_by(user_id=user_id).first()
-        if not cart:
-            cart = Cart(user_id=user_id)
-            db.session.add(cart)
-            db.session.flush()
-        
-        # Check if item already in cart
-        cart_item = CartItem.query.filter_by(cart_id=cart.id, artwork_id=artwork_id).first()
-        if cart_item:
-            cart_item.quantity += quantity
-        else:
-            cart_item = CartItem(cart_id=cart.id, artwork_id=artwork_id, quantity=quantity)
-            db.session.add(cart_item)
-            # Notify artist that their artwork was added to cart
-            NotificationService.notify_artwork_added_to_cart(artwork_id, user_id)
+        db.session.commit()
+        
+        # A fresh line means the artwork was just added: notify its artist
+        if added:
+            background.submit(NotificationService.notify_artwork_added_to_cart, artwork_id, user_id)
+        
+        return cart_response(user_id, since_version, 201)
+
+class CartBatchResource(Resource):
+    @jwt_required()
+    @handle_api_errors
+    @detect_conflicts
+    def post(self):
+        """Apply several add/set/remove operations in one transaction"""
+        user_id = current_user_id()
+        data = request.get_json() or {}
+        expected_version = expected_version_header()
+        since_version = since_version_arg(expected_version)
+        
+        changes = CartService.plan_operations(data.get('operations'))
+        new_lines, unavailable = CartService.apply_operations(user_id, changes, expected_version)
+        if unavailable:
+            db.session.rollback()
+            return {
+                "message": "Artwork not found or unavailable",
+                "unavailable": [str(artwork_id) for artwork_id in unavailable]
+            }, 404
         
         db.session.commit()
-        return cart_schema.dump(cart), 201
+        
+        for artwork_id in new_lines:
+            background.submit(NotificationService.notify_artwork_added_to_cart, artwork_id, user_id)
+        
+        return cart_response(user_id, since_version)
+
+class CartSummaryResource(Resource):
+    @jwt_required()
+    @handle_api_errors
+    def get(self):
+        """Item count and subtotal for the header badge"""
+        summary = CartService.summary(current_user_id())
+        return {
+            "item_count": summary.item_count,
+            "subtotal": float(summary.subtotal),
+            "version": summary.version
+        }, 200, cart_headers(summary.version)
 
 class CartItemResource(Resource):
     @jwt_required()
     @handle_api_errors
+    @detect_conflicts
     def patch(self, artwork_id):
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         data = request.get_json()
         quantity = data.get('quantity')
         
-        if quantity is None or quantity < 0:
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 0:
             return {"message": "Valid quantity is required"}, 400
+        if quantity > 1:
+            return {"message": ONE_OF_A_KIND}, 400
         
-        cart = Cart.query.filter_by(user_id=user_id).first()
-        if not cart:
-            return {"message": "Cart not found"}, 404
+        expected_version = expected_version_header()
+        since_version = since_version_arg(expected_version)
         
-        cart_item = CartItem.query.filter_by(cart_id=cart.id, artwork_id=artwork_id).first()
-        if not cart_item:
+        if not CartService.update_item(user_id, artwork_id, quantity, expected_version):
+            db.session.rollback()
             return {"message": "Item not found in cart"}, 404
         
-        if quantity == 0:
-            db.session.delete(cart_item)
-        else:
-            cart_item.quantity = quantity
-        
         db.session.commit()
-        return cart_schema.dump(cart), 200
+        return cart_response(user_id, since_version)
 
     @jwt_required()
     @handle_api_errors
+    @detect_conflicts
     def delete(self, artwork_id):
-        user_id = get_jwt_identity()
-        
-        cart = Cart.query.filter_by(user_id=user_id).first()
-        if not cart:
-            return {"message": "Cart not found"}, 404
+        user_id = current_user_id()
+        expected_version = expected_version_header()
+        since_version = since_version_arg(expected_version)
         
-        cart_item = CartItem.query.filter_by(cart_id=cart.id, artwork_id=artwork_id).first()
-        if not cart_item:
+        if not CartService.update_item(user_id, artwork_id, 0, expected_version):
+            db.session.rollback()
             return {"message": "Item not found in cart"}, 404
         
-        db.session.delete(cart_item)
         db.session.commit()
-        return cart_schema.dump(cart), 200
\ No newline at end of file
+        return cart_response(user_id, since_version)
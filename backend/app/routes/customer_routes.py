@@ -2,15 +2,12 @@ from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from ..extensions import db
-from ..models.artwork import Artwork, ArtworkSchema
+from ..models.artwork import Artwork
 from ..models.order import Order
-from ..models.user import User
 from ..models.notification import Notification, NotificationSchema
 from ..utils.decorators import role_required, handle_api_errors
-from ..utils.helpers import paginate_query
+from ..utils.artwork_listing import paginate_artworks, dump_artworks
 
-artwork_schema = ArtworkSchema()
-artworks_schema = ArtworkSchema(many=True)
 notification_schema = NotificationSchema()
 notifications_schema = NotificationSchema(many=True)
 
@@ -23,16 +20,10 @@ class CustomerArtworksResource(Resource):
         per_page = request.args.get('per_page', 12, type=int)
 
         query = Artwork.query.filter_by(is_available=True).order_by(Artwork.created_at.desc())
-        pagination = paginate_query(query, page, per_page)
-
-        artworks = artworks_schema.dump(pagination.items)
-        
-        for artwork in artworks:
-            artist = User.query.filter_by(id=artwork['artist_id']).first()
-            artwork['artist'] = artist.username if artist else 'Unknown Artist'
+        pagination = paginate_artworks(query, page, per_page)
 
         return {
-            'items': artworks,
+            'items': dump_artworks(pagination.items),
             'page': page,
             'per_page': per_page,
             'total': pagination.total,
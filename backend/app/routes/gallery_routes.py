@@ -1,92 +1,208 @@
-from flask import request
+from datetime import datetime, timezone
+from flask import request, Response, stream_with_context
 from flask_restful import Resource
-from sqlalchemy import or_
 from app.extensions import db
-from app.models.artwork import Artwork, ArtworkSchema
+from app.models.artwork import Artwork
 from app.models.user import User
-from app.utils.helpers import paginate_query
+from app.utils.artwork_listing import (
+    paginate_artworks, slice_artworks, dump_artworks,
+    parse_artwork_filters, apply_artwork_filters, artwork_facets, export_artworks,
+    parse_artwork_ids, artworks_by_ids
+)
+from app.utils.helpers import sort_clauses
+from app.utils.cache import gallery_cache, category_tag, artist_tag, ALL_CATEGORIES_TAG
+from app.utils.catalog import Catalog
+from app.utils.http_cache import make_etag, is_not_modified, cache_headers, not_modified
+from app.utils.streaming import ndjson_chunks, gzip_chunks
 from app.utils.decorators import handle_api_errors
 import uuid
 
-artwork_schema = ArtworkSchema()
-artworks_schema = ArtworkSchema(many=True)
+# Sort keys per `sort` option; the id tiebreaker makes the order total so
+# keyset cursors can resume exactly where the previous page stopped.
+SORT_KEYS = {
+    'newest': [(Artwork.created_at, True), (Artwork.id, True)],
+    'oldest': [(Artwork.created_at, False), (Artwork.id, False)],
+    'price-low': [(Artwork.price, False), (Artwork.id, False)],
+    'price-high': [(Artwork.price, True), (Artwork.id, True)],
+}
+
+def artwork_validators(artwork_id, updated_at, artist_updated_at):
+    """ETag and Last-Modified for one artwork, whose payload also shows the artist's name"""
+    last_modified = max((stamp for stamp in (updated_at, artist_updated_at) if stamp), default=None)
+    return make_etag('artwork', artwork_id, updated_at, artist_updated_at), last_modified
 
 class GalleryResource(Resource):
     @handle_api_errors
     def get(self, artwork_id=None):
         if artwork_id:
             return self.get_single_artwork(artwork_id)
+        if request.args.get('ids') is not None:
+            return self.get_artworks_by_ids(request.args['ids'])
         return self.get_artworks()
 
     def get_single_artwork(self, artwork_id):
         # Validate UUID format
         try:
-            uuid.UUID(artwork_id)
+            artwork_uuid = uuid.UUID(artwork_id)
         except ValueError:
             return {"message": "Invalid artwork ID format"}, 400
+
+        # Revalidation only needs the timestamps, not the artwork and artist
+        if request.if_none_match or request.if_modified_since:
+            row = db.session.query(Artwork.updated_at, User.updated_at.label('artist_updated_at')).\
+                outerjoin(User, User.id == Artwork.artist_id).\
+                filter(Artwork.id == artwork_uuid, Artwork.is_available == True).first()
+            if row:
+                etag, last_modified = artwork_validators(artwork_id, row.updated_at, row.artist_updated_at)
+                if is_not_modified(etag, last_modified):
+                    return not_modified(etag, last_modified)
             
-        artwork = Artwork.query.filter_by(id=artwork_id, is_available=True).first()
-        if not artwork:
+        artwork = artworks_by_ids([artwork_uuid]).get(artwork_uuid)
+        if not artwork or not artwork.is_available:
             return {"message": "Artwork not found"}, 404
 
-        artist = User.query.filter_by(id=artwork.artist_id).first()
-        artwork_data = artwork_schema.dump(artwork)
-        artwork_data['artist'] = artist.username if artist else 'Unknown Artist'
+        artwork_data = dump_artworks([artwork])[0]
+
+        etag, last_modified = artwork_validators(
+            artwork_id, artwork.updated_at, artwork.artist.updated_at if artwork.artist else None
+        )
+        return artwork_data, 200, cache_headers(etag, last_modified)
+
+    def get_artworks_by_ids(self, ids):
+        """Many artworks in one query, in request order, with per-id status"""
+        requested = parse_artwork_ids(ids)
+
+        catalog = Catalog.current()
+        etag = make_etag('ids', catalog.version, *(raw for raw, _ in requested))
+        if is_not_modified(etag, catalog.updated_at):
+            return not_modified(etag, catalog.updated_at)
+
+        artworks = artworks_by_ids([artwork_id for _, artwork_id in requested if artwork_id])
 
-        return artwork_data, 200
+        items = []
+        for raw, artwork_id in requested:
+            artwork = artworks.get(artwork_id)
+            if artwork_id is None:
+                items.append({'id': raw, 'status': 'invalid'})
+            elif artwork is None:
+                items.append({'id': raw, 'status': 'not_found'})
+            elif not artwork.is_available:
+                items.append({'id': raw, 'status': 'unavailable'})
+            else:
+                items.append({'id': raw, 'status': 'ok', 'artwork': dump_artworks([artwork])[0]})
+
+        return {'items': items}, 200, cache_headers(etag, catalog.updated_at)
 
     def get_artworks(self):
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 12, type=int)
-        category = request.args.get('category')
-        search = request.args.get('search')
-        sort = request.args.get('sort', 'newest')
-        min_price = request.args.get('minPrice', type=float)
-        max_price = request.args.get('maxPrice', type=float)
+        sort = request.args.get('sort')
+        cursor = request.args.get('cursor')
+        filters = parse_artwork_filters(request.args)
+
+        # The catalog version changes with every artwork write, so it both
+        # validates client copies and keeps cache entries from going stale
+        catalog = Catalog.current()
+        key = ('page', catalog.version, page, per_page, sort, cursor, filters)
+        etag = make_etag(*key)
+        if is_not_modified(etag, catalog.updated_at):
+            return not_modified(etag, catalog.updated_at)
+
+        def compute():
+            body = self.list_artworks(page, per_page, sort, cursor, filters)
+            tags = {category_tag(filters.category)}
+            tags.update(artist_tag(item['artist_id']) for item in body['items'])
+            return body, tags
 
+        body = gallery_cache.get_or_compute(key, compute)
+        return body, 200, cache_headers(etag, catalog.updated_at)
+
+    def list_artworks(self, page, per_page, sort, cursor, filters):
         query = Artwork.query.filter_by(is_available=True)
 
         # Apply filters
-        if category and category != 'All Categories':
-            query = query.filter_by(category=category.lower())
-
-        if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Artwork.title.ilike(search_term),
-                    Artwork.description.ilike(search_term)
-                )
-            )
+        query, matches = apply_artwork_filters(query, filters)
 
-        if min_price is not None:
-            query = query.filter(Artwork.price >= min_price)
+        # Searches rank by relevance unless another sort is asked for
+        relevance = matches is not None and sort in (None, 'relevance') and cursor is None
+        if sort not in SORT_KEYS:
+            sort = 'newest'
 
-        if max_price is not None:
-            query = query.filter(Artwork.price <= max_price)
+        # Opt-in keyset mode: seek past the cursor, no OFFSET and no COUNT
+        if cursor is not None:
+            result = slice_artworks(query, SORT_KEYS[sort], cursor, per_page, scope=sort)
+            return {
+                'items': dump_artworks(result.items),
+                'per_page': per_page,
+                'next_cursor': result.next_cursor
+            }
 
         # Apply sorting
-        if sort == 'oldest':
-            query = query.order_by(Artwork.created_at.asc())
-        elif sort == 'price-low':
-            query = query.order_by(Artwork.price.asc())
-        elif sort == 'price-high':
-            query = query.order_by(Artwork.price.desc())
-        else:  # newest
-            query = query.order_by(Artwork.created_at.desc())
-
-        pagination = paginate_query(query, page, per_page)
-        artworks = artworks_schema.dump(pagination.items)
-        
-        # Add artist names
-        for artwork in artworks:
-            artist = User.query.filter_by(id=artwork['artist_id']).first()
-            artwork['artist'] = artist.username if artist else 'Unknown Artist'
+        if relevance:
+            query = query.order_by(matches.c.rank.desc(), Artwork.id.desc())
+        else:
+            query = query.order_by(*sort_clauses(SORT_KEYS[sort]))
+
+        # Artists and the total come back with the page in one query
+        pagination = paginate_artworks(query, page, per_page)
 
         return {
-            'items': artworks,
+            'items': dump_artworks(pagination.items),
             'page': page,
             'per_page': per_page,
             'total': pagination.total,
             'total_pages': pagination.pages
-        }, 200
\ No newline at end of file
+        }
+
+class GalleryFacetsResource(Resource):
+    @handle_api_errors
+    def get(self):
+        """Per-category counts and price histogram for the gallery sidebar"""
+        filters = parse_artwork_filters(request.args)
+        catalog = Catalog.current()
+        key = ('facets', catalog.version, filters)
+        etag = make_etag(*key)
+        if is_not_modified(etag, catalog.updated_at):
+            return not_modified(etag, catalog.updated_at)
+
+        # Facets count across every category, so any artwork write affects them
+        facets = gallery_cache.get_or_compute(
+            key,
+            lambda: (artwork_facets(filters), {ALL_CATEGORIES_TAG})
+        )
+        return facets, 200, cache_headers(etag, catalog.updated_at)
+
+def parse_updated_since(value):
+    """Parse the `updated_since` export parameter into a naive UTC datetime"""
+    if not value:
+        return None
+    try:
+        since = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError('updated_since must be an ISO 8601 timestamp')
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+class GalleryExportResource(Resource):
+    @handle_api_errors
+    def get(self):
+        """Stream the whole available catalog as NDJSON for partner syncs.
+
+        Pass `updated_since` to receive only artworks changed at or after that
+        time, sold and withdrawn ones included (`is_available` false). The
+        body is gzip-compressed when the client accepts it.
+        """
+        updated_since = parse_updated_since(request.args.get('updated_since'))
+
+        chunks = ndjson_chunks(export_artworks(updated_since))
+        headers = {'Vary': 'Accept-Encoding'}
+        if 'gzip' in request.accept_encodings:
+            chunks = gzip_chunks(chunks)
+            headers['Content-Encoding'] = 'gzip'
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype='application/x-ndjson',
+            headers=headers
+        )
@@ -1,10 +1,12 @@
 from flask import request
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from marshmallow import ValidationError
 import stripe
 import os
 from dotenv import load_dotenv
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 from ..extensions import db
 
 # Load environment variables
@@ -15,48 +17,80 @@ stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 print(f'Stripe API key configured: {"Yes" if stripe.api_key else "No"}')
 if stripe.api_key:
     print(f'Stripe key starts with: {stripe.api_key[:7]}...')
-from ..models.order import Order, OrderSchema, OrderItem
+from ..models.order import Order
 from ..models.artwork import Artwork
 from ..models.payment import Payment, PaymentSchema
 from ..models.delivery import Delivery, DeliverySchema
 from ..models.notification import Notification, NotificationSchema
-from ..models.user import User
 from ..utils.decorators import handle_api_errors
-from ..utils.helpers import paginate_query
-from ..utils.email_service import EmailService
+from ..utils.identity import current_identity, current_user_id
+from ..utils.helpers import paginate_query, keyset_paginate, sort_clauses
 from ..utils.notification_service import NotificationService
+from ..utils.serializers import serialize_order, serialize_orders
+from ..utils.order_service import OrderService, SHIPPING_FIELDS, order_access
+from ..utils.cart_service import CartService
+from .cart_routes import expected_version_header, detect_conflicts
 
-order_schema = OrderSchema()
-orders_schema = OrderSchema(many=True)
 payment_schema = PaymentSchema()
 delivery_schema = DeliverySchema()
 notification_schema = NotificationSchema()
 
+ORDER_SORT_KEYS = [(Order.created_at, True), (Order.id, True)]
+
+# Everything serialize_order() walks, loaded up front with one IN query per
+# relationship; line artworks come from the batched ArtworkLoader instead
+ORDER_PAYLOAD_OPTIONS = (
+    selectinload(Order.items),
+    selectinload(Order.payments),
+    selectinload(Order.deliveries),
+)
+
+def refused_checkout(unavailable):
+    """Response for a checkout refused over `unavailable` artworks.
+
+    409 when they all exist but are sold (or withdrawn), as when another
+    checkout got there first; 404 when one of them does not exist.
+    """
+    existing = set(db.session.execute(select(Artwork.id).where(Artwork.id.in_(unavailable))).scalars())
+    missing = [artwork_id for artwork_id in unavailable if artwork_id not in existing]
+    if missing:
+        message, status = f'Artwork {missing[0]} not found', 404
+    else:
+        message, status = f'Artwork {unavailable[0]} is no longer available', 409
+    return {
+        'message': message,
+        'unavailable': [str(artwork_id) for artwork_id in unavailable]
+    }, status
+
 class OrdersResource(Resource):
     @jwt_required()
     @handle_api_errors
     def get(self):
         """Get orders based on user role"""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = current_identity()
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
+        cursor = request.args.get('cursor')
+
+        # Artists see orders for their artworks (an EXISTS, one row per
+        # order), collectors their own orders
+        query = Order.query.filter(order_access(user)).options(*ORDER_PAYLOAD_OPTIONS)
 
-        if user.role == 'artist':
-            # Artists see orders for their artworks
-            query = Order.query.\
-                join(OrderItem).\
-                join(Artwork).\
-                filter(Artwork.artist_id == user_id).\
-                order_by(Order.created_at.desc())
-        else:
-            # Collectors see their own orders
-            query = Order.query.filter_by(customer_id=user_id).order_by(Order.created_at.desc())
+        if cursor is not None:
+            result = keyset_paginate(query, ORDER_SORT_KEYS, cursor, per_page, scope='orders')
+            return {
+                'items': serialize_orders(result.items),
+                'pagination': {
+                    'per_page': per_page,
+                    'next_cursor': result.next_cursor
+                }
+            }, 200
 
+        query = query.order_by(*sort_clauses(ORDER_SORT_KEYS))
         pagination = paginate_query(query, page, per_page)
 
         return {
-            'items': orders_schema.dump(pagination.items),
+            'items': serialize_orders(pagination.items),
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -69,126 +103,104 @@ class OrdersResource(Resource):
     @handle_api_errors
     def post(self):
         """Create new order"""
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         data = request.get_json()
 
-        # Validate required fields
-        if not data.get('items') or not isinstance(data['items'], list):
-            return {'message': 'Order items are required'}, 400
+        artwork_ids = OrderService.plan_lines(data.get('items'))
 
         # Validate shipping details
-        shipping_required = ['fullName', 'address', 'city', 'country', 'postalCode']
-        shipping_details = data.get('shipping_details', {})
-        for field in shipping_required:
+        shipping_details = data.get('shipping_details') or {}
+        for field in SHIPPING_FIELDS:
             if not shipping_details.get(field):
                 return {'message': f'Shipping {field} is required'}, 400
 
-        # Calculate total and validate artworks
-        total_amount = 0
-        order_items = []
+        # Lock, check and mark every artwork sold in one pass
+        artworks, unavailable = OrderService.reserve_artworks(artwork_ids)
+        if unavailable:
+            db.session.rollback()
+            return refused_checkout(unavailable)
 
-        for item in data['items']:
-            artwork_id = item.get('artwork_id')
-            quantity = item.get('quantity', 1)
+        # Artist notifications and the confirmation email ride along as outbox rows
+        order = OrderService.create_order(user_id, artwork_ids, artworks, shipping_details)
+        db.session.commit()
+        OrderService.invalidate_sold(artworks)
 
-            artwork = Artwork.query.filter_by(id=artwork_id, is_available=True).first()
-            if not artwork:
-                return {'message': f'Artwork {artwork_id} not found or unavailable'}, 404
+        return serialize_order(order), 201
 
-            item_total = artwork.price * quantity
-            total_amount += item_total
+class OrderFromCartResource(Resource):
+    @jwt_required()
+    @handle_api_errors
+    @detect_conflicts
+    def post(self):
+        """Place an order for everything in the user's cart and empty it"""
+        user_id = current_user_id()
+        data = request.get_json() or {}
 
-            order_item = OrderItem(
-                artwork_id=artwork_id,
-                quantity=quantity,
-                price=item_total
-            )
-            order_items.append(order_item)
-
-        # Create order
-        order = Order(
-            customer_id=user_id,
-            total_amount=total_amount,
-            shipping_address=shipping_details['address'],
-            shipping_city=shipping_details['city'],
-            shipping_country=shipping_details['country'],
-            shipping_postal_code=shipping_details['postalCode'],
-            items=order_items
-        )
-
-        db.session.add(order)
-        db.session.commit()
+        shipping_details = data.get('shipping_details') or {}
+        for field in SHIPPING_FIELDS:
+            if not shipping_details.get(field):
+                return {'message': f'Shipping {field} is required'}, 400
 
-        # Send notifications to artists
-        NotificationService.notify_order_placed(order)
-        NotificationService.notify_payment_received(order)
+        # Cart lines, pricing, locking and the emptied cart share one transaction
+        lines = CartService.take_lines(user_id, expected_version_header())
+        if not lines:
+            db.session.rollback()
+            return {'message': 'Cart is empty'}, 400
 
-        # Send order confirmation email
         try:
-            customer = User.query.get(user_id)
-            if customer and customer.email:
-                EmailService.send_order_confirmation(customer.email, order)
-        except Exception as e:
-            # Log error but don't fail the order creation
-            import logging
-            logging.error(f'Failed to send order confirmation email: {str(e)}')
+            artwork_ids = OrderService.plan_lines([
+                {'artwork_id': line.artwork_id, 'quantity': line.quantity} for line in lines
+            ])
+        except ValueError:
+            db.session.rollback()
+            raise
+
+        artworks, unavailable = OrderService.reserve_artworks(artwork_ids)
+        if unavailable:
+            db.session.rollback()
+            return refused_checkout(unavailable)
+
+        order = OrderService.create_order(user_id, artwork_ids, artworks, shipping_details)
+        db.session.commit()
+        OrderService.invalidate_sold(artworks)
 
-        return order_schema.dump(order), 201
+        return serialize_order(order), 201
 
 class OrderDetailResource(Resource):
     @jwt_required()
     @handle_api_errors
     def get(self, order_id):
         """Get specific order details"""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-
-        order = Order.query.get(order_id)
+        order = OrderService.find_accessible(order_id, current_identity(), *ORDER_PAYLOAD_OPTIONS)
         if not order:
             return {'message': 'Order not found'}, 404
 
-        # Check permissions
-        if user.role == 'collector' and order.customer_id != user_id:
-            return {'message': 'Access denied'}, 403
-
-        if user.role == 'artist':
-            # Check if artist has artworks in this order
-            has_artwork = any(item.artwork.artist_id == user_id for item in order.items)
-            if not has_artwork:
-                return {'message': 'Access denied'}, 403
-
-        return order_schema.dump(order), 200
+        return serialize_order(order), 200
 
     @jwt_required()
     @handle_api_errors
     def put(self, order_id):
         """Update order status"""
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-
-        order = Order.query.get(order_id)
+        order = OrderService.find_accessible(order_id, current_identity(), *ORDER_PAYLOAD_OPTIONS)
         if not order:
             return {'message': 'Order not found'}, 404
 
-        # Check permissions
-        if user.role == 'artist':
-            has_artwork = any(item.artwork.artist_id == user_id for item in order.items)
-            if not has_artwork:
-                return {'message': 'Access denied'}, 403
-        elif user.role == 'collector' and order.customer_id != user_id:
-            return {'message': 'Access denied'}, 403
-
         data = request.get_json()
         new_status = data.get('status')
 
         if new_status and new_status in ['pending', 'confirmed', 'processing', 'shipped', 'delivered', 'cancelled']:
             order.status = new_status
-            db.session.commit()
 
-            # Notify customer of status change
+            # Notify customer of status change, in the same transaction
             NotificationService.notify_order_status_change(order, new_status)
+            db.session.flush()
+
+            # Serialized before the commit expires the eagerly loaded order
+            payload = serialize_order(order)
+            db.session.commit()
+            return payload, 200
 
-        return order_schema.dump(order), 200
+        return serialize_order(order), 200
 
 class StripePaymentIntentResource(Resource):
     @jwt_required()
@@ -1,47 +1,52 @@
 from flask import request
 from flask_restful import Resource
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from ..extensions import db
 from ..models.wishlist import Wishlist, WishlistItem, WishlistSchema
 from ..models.artwork import Artwork
 from ..utils.decorators import handle_api_errors
+from ..utils.identity import current_user_id
 from ..utils.notification_service import NotificationService
+from ..utils.helpers import get_or_create_for_user
+import uuid
 
 wishlist_schema = WishlistSchema()
 
+def parse_artwork_id(artwork_id):
+    try:
+        return uuid.UUID(str(artwork_id))
+    except ValueError:
+        raise ValueError('Invalid artwork ID format')
+
 class WishlistResource(Resource):
     @jwt_required()
     @handle_api_errors
     def get(self):
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         wishlist = Wishlist.query.filter_by(user_id=user_id).first()
         
+        # Users without a wishlist see an empty one; it is stored on first add
         if not wishlist:
             wishlist = Wishlist(user_id=user_id)
-            db.session.add(wishlist)
-            db.session.commit()
         
         return wishlist_schema.dump(wishlist), 200
 
     @jwt_required()
     @handle_api_errors
     def post(self):
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
         data = request.get_json()
         artwork_id = data.get('artworkId')
 
         if not artwork_id:
             return {"message": "artworkId is required"}, 400
+        artwork_id = parse_artwork_id(artwork_id)
 
         artwork = Artwork.query.filter_by(id=artwork_id, is_available=True).first()
         if not artwork:
             return {"message": "Artwork not found or unavailable"}, 404
 
-        wishlist = Wishlist.query.filter_by(user_id=user_id).first()
-        if not wishlist:
-            wishlist = Wishlist(user_id=user_id)
-            db.session.add(wishlist)
-            db.session.flush()
+        wishlist = get_or_create_for_user(Wishlist, user_id)
 
         existing_item = WishlistItem.query.filter_by(
             wishlist_id=wishlist.id, 
@@ -67,7 +72,8 @@ class WishlistItemResource(Resource):
     @jwt_required()
     @handle_api_errors
     def delete(self, artwork_id):
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
+        artwork_id = parse_artwork_id(artwork_id)
         
         wishlist = Wishlist.query.filter_by(user_id=user_id).first()
         if not wishlist:
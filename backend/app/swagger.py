@@ -1,6 +1,7 @@
 from flask_restx import Api, Resource, fields
 from flask import Blueprint, request
 from flask_cors import CORS
+from flask_jwt_extended import jwt_required
 
 # Create blueprint for Swagger
 swagger_bp = Blueprint('swagger', __name__)
@@ -71,6 +72,22 @@ class GalleryListResource(Resource):
     def options(self):
         return {}, 200
 
+@gallery_ns.route('/facets')
+class GalleryFacetsResource(Resource):
+    def get(self):
+        return gallery_routes.GalleryFacetsResource().get()
+    
+    def options(self):
+        return {}, 200
+
+@gallery_ns.route('/export')
+class GalleryExportResource(Resource):
+    def get(self):
+        return gallery_routes.GalleryExportResource().get()
+    
+    def options(self):
+        return {}, 200
+
 @gallery_ns.route('/<string:artwork_id>')
 class GalleryDetailResource(Resource):
     def get(self, artwork_id):
@@ -109,14 +126,12 @@ class ArtistArtworkDetailResource(Resource):
 class UploadImageResource(Resource):
     def post(self):
         from flask import request
-        from flask_jwt_extended import get_jwt_identity
-        from app.models.user import User
+        from app.utils.identity import current_identity
         from app.utils.cloudinary_service import CloudinaryService
         
         try:
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            if not user or user.role != 'artist':
+            identity = current_identity()
+            if not identity or identity.role != 'artist':
                 return {'message': 'Access denied'}, 403
         except:
             return {'message': 'Authentication required'}, 401
@@ -153,6 +168,22 @@ class CartResource(Resource):
     def options(self):
         return {}, 200
 
+@cart_ns.route('/batch')
+class CartBatchResource(Resource):
+    def post(self):
+        return cart_routes.CartBatchResource().post()
+    
+    def options(self):
+        return {}, 200
+
+@cart_ns.route('/summary')
+class CartSummaryResource(Resource):
+    def get(self):
+        return cart_routes.CartSummaryResource().get()
+    
+    def options(self):
+        return {}, 200
+
 @cart_ns.route('/<string:artwork_id>')
 class CartItemResource(Resource):
     def patch(self, artwork_id):
@@ -196,24 +227,65 @@ class OrdersResource(Resource):
     def options(self):
         return {}, 200
 
+@orders_ns.route('/from-cart')
+class OrderFromCartResource(Resource):
+    def post(self):
+        return order_routes.OrderFromCartResource().post()
+    
+    def options(self):
+        return {}, 200
+
+@orders_ns.route('/<string:order_id>')
+class OrderDetailResource(Resource):
+    def get(self, order_id):
+        return order_routes.OrderDetailResource().get(order_id)
+    
+    def put(self, order_id):
+        return order_routes.OrderDetailResource().put(order_id)
+    
+    def options(self, order_id):
+        return {}, 200
+
 # Collectors routes
 @collectors_ns.route('/notifications')
 class CollectorNotificationsResource(Resource):
+    @jwt_required()
     def get(self):
-        try:
-            from flask_jwt_extended import get_jwt_identity
-            from app.models.notification import Notification
-            
-            user_id = get_jwt_identity()
-            notifications = Notification.query.filter_by(user_id=user_id).order_by(Notification.created_at.desc()).all()
-            return [{
-                'id': n.id,
+        import uuid
+        from flask_jwt_extended import get_jwt_identity
+        from app.models.notification import Notification
+        from app.utils.helpers import keyset_paginate
+
+        def dump(n):
+            return {
+                'id': str(n.id),
                 'title': n.title,
                 'message': n.message,
                 'type': n.type,
                 'read': n.read,
                 'timestamp': n.created_at.isoformat() if n.created_at else None
-            } for n in notifications], 200
+            }
+
+        query = Notification.query.filter_by(user_id=uuid.UUID(get_jwt_identity()))
+
+        # Opt-in keyset mode: newest first, seeking past the cursor
+        cursor = request.args.get('cursor')
+        if cursor is not None:
+            per_page = request.args.get('per_page', 20, type=int)
+            keys = [(Notification.created_at, True), (Notification.id, True)]
+            try:
+                result = keyset_paginate(query, keys, cursor, per_page, scope='notifications')
+            except ValueError as e:
+                return {'message': str(e)}, 400
+            return {
+                'items': [dump(n) for n in result.items],
+                'per_page': per_page,
+                'next_cursor': result.next_cursor
+            }, 200
+
+        try:
+            notifications = query.order_by(Notification.created_at.desc()).all()
+            return [dump(n) for n in notifications], 200
         except Exception as e:
             return [], 200
     
@@ -0,0 +1,245 @@
+import uuid
+from collections import namedtuple
+from math import ceil
+from sqlalchemy import or_, and_, case, true, select
+from sqlalchemy.orm import contains_eager
+from ..extensions import db
+from ..models.artwork import Artwork
+from ..models.user import User
+from .helpers import keyset_paginate
+from .search import ArtworkSearch
+from .serializers import serialize_artwork
+
+ArtworkPage = namedtuple('ArtworkPage', ['items', 'total', 'pages'])
+ArtworkFilters = namedtuple('ArtworkFilters', ['category', 'search', 'min_price', 'max_price'])
+
+# Lower bounds of the price histogram buckets; the last bucket is open-ended
+PRICE_BUCKETS = [0, 100, 250, 500, 1000, 2500, 5000]
+
+# Rows fetched per round trip while streaming the catalog export
+EXPORT_BATCH_SIZE = 500
+
+# Most ids a single multi-get request may ask for
+MAX_BATCH_IDS = 100
+
+
+def parse_artwork_filters(args) -> ArtworkFilters:
+    """Read the gallery filter query parameters shared by listing and facets.
+
+    Values are normalized so equivalent requests compare (and cache) equal.
+    """
+    category = args.get('category')
+    if not category or category == 'All Categories':
+        category = None
+    search = ' '.join((args.get('search') or '').lower().split())
+    return ArtworkFilters(
+        category=category.lower() if category else None,
+        search=search or None,
+        min_price=args.get('minPrice', type=float),
+        max_price=args.get('maxPrice', type=float)
+    )
+
+
+def apply_artwork_filters(query, filters: ArtworkFilters):
+    """Apply gallery filters to an Artwork query.
+
+    Returns the filtered query and the search match subquery (None when there
+    is no indexed search), whose `rank` column can be used for ordering.
+    """
+    if filters.category:
+        query = query.filter(Artwork.category == filters.category)
+
+    matches = None
+    if filters.search:
+        matches = ArtworkSearch.match(filters.search)
+        if matches is not None:
+            query = query.join(matches, matches.c.artwork_id == Artwork.id)
+        else:
+            search_term = f"%{filters.search}%"
+            query = query.filter(
+                or_(
+                    Artwork.title.ilike(search_term),
+                    Artwork.description.ilike(search_term)
+                )
+            )
+
+    if filters.min_price is not None:
+        query = query.filter(Artwork.price >= filters.min_price)
+
+    if filters.max_price is not None:
+        query = query.filter(Artwork.price <= filters.max_price)
+
+    return query, matches
+
+
+def artist_name(artwork):
+    """Display name used for the `artist` field of gallery payloads"""
+    return artwork.artist.username if artwork.artist else 'Unknown Artist'
+
+
+def _with_artist(query):
+    return query.outerjoin(Artwork.artist).options(contains_eager(Artwork.artist))
+
+
+def paginate_artworks(query, page: int = 1, per_page: int = 12) -> ArtworkPage:
+    """Fetch one page of artworks together with their artists and the total.
+
+    The artist is joined into the page query and the total rides along as a
+    window count, so a page costs a single round trip. Only a request past
+    the last page (no rows to carry the count) falls back to a COUNT query.
+    """
+    page = max(1, int(page))
+    per_page = max(1, int(per_page))
+
+    rows = _with_artist(query).\
+        add_columns(db.func.count().over().label('total')).\
+        limit(per_page).\
+        offset((page - 1) * per_page).\
+        all()
+
+    if rows:
+        total = rows[0].total
+    elif page > 1:
+        total = query.order_by(None).count()
+    else:
+        total = 0
+
+    pages = ceil(total / per_page) if total else 0
+    return ArtworkPage(items=[row[0] for row in rows], total=total, pages=pages)
+
+
+def parse_artwork_ids(value):
+    """Split a comma-separated `ids` parameter into (raw, UUID or None) pairs"""
+    raw_ids = [raw.strip() for raw in value.split(',') if raw.strip()]
+    if not raw_ids:
+        raise ValueError('ids must list at least one artwork id')
+    if len(raw_ids) > MAX_BATCH_IDS:
+        raise ValueError(f'ids may list at most {MAX_BATCH_IDS} artwork ids')
+
+    parsed = []
+    for raw in raw_ids:
+        try:
+            parsed.append((raw, uuid.UUID(raw)))
+        except ValueError:
+            parsed.append((raw, None))
+    return parsed
+
+
+def artworks_by_ids(ids):
+    """Fetch artworks and their artists for a list of UUIDs in one query.
+
+    Unavailable artworks are included so callers can tell them apart from
+    ids that do not exist. Returns a dict keyed by artwork id.
+    """
+    if not ids:
+        return {}
+    artworks = _with_artist(Artwork.query.filter(Artwork.id.in_(set(ids)))).all()
+    return {artwork.id: artwork for artwork in artworks}
+
+
+def slice_artworks(query, keys, cursor: str = None, per_page: int = 12, scope: str = ''):
+    """Keyset variant of `paginate_artworks`: seek past `cursor`, no total"""
+    return keyset_paginate(_with_artist(query), keys, cursor, per_page, scope)
+
+
+def dump_artworks(artworks):
+    """Serialize artworks whose artist is already loaded, adding artist names"""
+    return [serialize_artwork(artwork, artist_name(artwork)) for artwork in artworks]
+
+
+def export_artworks(updated_since=None, batch_size: int = EXPORT_BATCH_SIZE):
+    """Yield catalog artworks as gallery payloads, oldest change first.
+
+    A full export holds the available artworks. With `updated_since` it holds
+    every artwork changed at or after that time, including ones that have
+    since been sold or withdrawn, so partners can drop them; each payload's
+    `is_available` tells the two apart.
+
+    Rows come from a server-side cursor `batch_size` at a time and are plain
+    column tuples rather than ORM instances, so memory stays flat whatever the
+    catalog size. Ordering by `updated_at` lets incremental syncs pass the last
+    `updated_at` they saw back as `updated_since`.
+    """
+    artworks = Artwork.__table__
+    query = select(*artworks.c, User.username.label('artist_name')).\
+        outerjoin(User, User.id == artworks.c.artist_id)
+    if updated_since is not None:
+        query = query.where(artworks.c.updated_at >= updated_since)
+    else:
+        query = query.where(artworks.c.is_available == True)
+    query = query.order_by(artworks.c.updated_at, artworks.c.id).\
+        execution_options(yield_per=batch_size)
+
+    for row in db.session.execute(query):
+        yield serialize_artwork(row, row.artist_name or 'Unknown Artist')
+
+
+def _bucket_label(index):
+    low = PRICE_BUCKETS[index]
+    if index + 1 < len(PRICE_BUCKETS):
+        return f'{low}-{PRICE_BUCKETS[index + 1]}'
+    return f'{low}+'
+
+
+def artwork_facets(filters: ArtworkFilters):
+    """Category counts, price histogram and price range in one aggregation.
+
+    Each facet ignores its own filter (category counts honour the price range,
+    price buckets honour the category) so the sidebar can show alternatives.
+    Rows are grouped by category, bucket and whether they pass each of the two
+    filters, and the facets are folded together from that single result.
+    """
+    bucket = case(
+        *[(Artwork.price >= low, i) for i, low in reversed(list(enumerate(PRICE_BUCKETS)))],
+        else_=0
+    ).label('bucket')
+
+    in_category = (Artwork.category == filters.category) if filters.category else true()
+    price_bounds = []
+    if filters.min_price is not None:
+        price_bounds.append(Artwork.price >= filters.min_price)
+    if filters.max_price is not None:
+        price_bounds.append(Artwork.price <= filters.max_price)
+    in_price = and_(*price_bounds) if price_bounds else true()
+
+    in_category = case((in_category, 1), else_=0).label('in_category')
+    in_price = case((in_price, 1), else_=0).label('in_price')
+
+    query = db.session.query(
+        Artwork.category,
+        bucket,
+        in_category,
+        in_price,
+        db.func.count().label('count'),
+        db.func.min(Artwork.price).label('min_price'),
+        db.func.max(Artwork.price).label('max_price')
+    ).filter(Artwork.is_available == True)
+    query, _ = apply_artwork_filters(query, filters._replace(category=None, min_price=None, max_price=None))
+    rows = query.group_by(Artwork.category, bucket, in_category, in_price).all()
+
+    categories = {}
+    buckets = [0] * len(PRICE_BUCKETS)
+    total, low, high = 0, None, None
+    for row in rows:
+        if row.in_price:
+            categories[row.category] = categories.get(row.category, 0) + row.count
+        if row.in_category:
+            buckets[row.bucket] += row.count
+        if row.in_category and row.in_price:
+            total += row.count
+            low = row.min_price if low is None else min(low, row.min_price)
+            high = row.max_price if high is None else max(high, row.max_price)
+
+    return {
+        'total': total,
+        'categories': [
+            {'category': name, 'count': count}
+            for name, count in sorted(categories.items())
+        ],
+        'price_buckets': [
+            {'range': _bucket_label(i), 'min': PRICE_BUCKETS[i], 'count': count}
+            for i, count in enumerate(buckets)
+        ],
+        'min_price': float(low) if low is not None else None,
+        'max_price': float(high) if high is not None else None
+    }
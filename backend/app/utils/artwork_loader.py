@@ -0,0 +1,62 @@
+import uuid
+from flask import g, request, has_request_context
+from sqlalchemy import select
+from ..extensions import db
+from ..models.artwork import Artwork
+from ..models.user import User
+
+
+def _key(artwork_id):
+    return artwork_id if isinstance(artwork_id, uuid.UUID) else uuid.UUID(str(artwork_id))
+
+
+class ArtworkLoader:
+    """Batches the artwork lookups behind cart, wishlist and order lines.
+
+    Serializers queue the ids they will need with prime(), then call get()
+    per line: the first get() fetches every queued artwork with its
+    artist's name in one IN query. Rows are plain result rows (artwork
+    columns plus `artist_name`), so they survive commits and expiry.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self._pending = set()
+
+    def prime(self, artwork_ids):
+        for artwork_id in artwork_ids:
+            if artwork_id is not None:
+                key = _key(artwork_id)
+                if key not in self._rows:
+                    self._pending.add(key)
+
+    def _fetch(self):
+        ids, self._pending = self._pending, set()
+        artworks = Artwork.__table__
+        rows = db.session.execute(
+            select(artworks, User.full_name.label('artist_name')).
+            outerjoin(User, User.id == artworks.c.artist_id).
+            where(artworks.c.id.in_(ids))
+        ).all()
+        self._rows.update((row.id, row) for row in rows)
+        for artwork_id in ids:
+            self._rows.setdefault(artwork_id, None)
+
+    def get(self, artwork_id):
+        """The artwork row for `artwork_id`, or None if it does not exist"""
+        if artwork_id is None:
+            return None
+        key = _key(artwork_id)
+        if key not in self._rows:
+            self._pending.add(key)
+            self._fetch()
+        return self._rows[key]
+
+
+def artwork_loader() -> ArtworkLoader:
+    """The loader for the current request (or app context outside a request)"""
+    owner = request._get_current_object() if has_request_context() else None
+    memo = g.get('_artwork_loader')
+    if memo is None or memo[0] is not owner:
+        memo = g._artwork_loader = (owner, ArtworkLoader())
+    return memo[1]
@@ -0,0 +1,61 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTasks:
+    """Fire-and-forget work run after the response, inside an app context.
+
+    Tasks run on a small thread pool so slow side effects (outbound email,
+    follow-up notifications) stay off the request path. Failures are logged,
+    never raised to the caller. With `workers` at 0 tasks run inline, which
+    keeps tests and scripts deterministic.
+    """
+
+    def __init__(self, workers: int = 0):
+        self.app = None
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        with self._lock:
+            self.app = app
+            self.workers = app.config['BACKGROUND_WORKERS']
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='background')
+            return self._executor
+
+    def _run(self, fn, args, kwargs):
+        with self.app.app_context():
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                logger.exception('Background task %s failed', getattr(fn, '__name__', fn))
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def submit(self, fn, *args, **kwargs):
+        if not self.workers:
+            self._run(fn, args, kwargs)
+            return
+        self._pool().submit(self._run, fn, args, kwargs)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+background = BackgroundTasks()
@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """A computation in progress that concurrent misses wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class ResponseCache:
+    """In-process LRU cache for computed response payloads.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted beyond `maxsize`. Each entry carries tags so writers can drop
+    exactly the entries a change affects. Concurrent misses on the same key
+    are collapsed: one caller computes, the others wait for its result.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._flights = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'invalidations': 0}
+
+    def configure(self, maxsize: int = None, ttl: float = None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, tags, expires_at = entry
+        if expires_at < time.monotonic():
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def set(self, key, value, tags=()):
+        with self._lock:
+            self._store(key, value, tags)
+
+    def _store(self, key, value, tags):
+        self._discard(key)
+        tags = frozenset(tags)
+        self._entries[key] = (value, tags, time.monotonic() + self.ttl)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self._stats['evictions'] += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, computing it once on a miss.
+
+        `compute` returns a `(value, tags)` pair. Callers that miss while
+        another thread is computing the same key wait for that result
+        instead of running the query again.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._stats['hits'] += 1
+                return entry[0]
+            flight = self._flights.get(key)
+            if flight is None:
+                self._stats['misses'] += 1
+                flight = self._flights[key] = _Flight()
+                leader = True
+                generation = self._generation
+            else:
+                self._stats['coalesced'] += 1
+                leader = False
+
+        if not leader:
+            flight.done.wait()
+            if not flight.failed:
+                return flight.value
+            value, _ = compute()
+            return value
+
+        try:
+            value, tags = compute()
+        except Exception:
+            flight.failed = True
+            raise
+        else:
+            flight.value = value
+            with self._lock:
+                # A write that landed mid-computation may have made this stale
+                if generation == self._generation:
+                    self._store(key, value, tags)
+            return value
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags"""
+        with self._lock:
+            self._generation += 1
+            self._stats['invalidations'] += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries), maxsize=self.maxsize, ttl=self.ttl)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# Public gallery pages and facets. Entries are tagged `category:<name>` for
+# category-filtered results, `category:*` for results spanning all
+# categories, and `artist:<id>` for every artist whose name they show.
+gallery_cache = ResponseCache(maxsize=512, ttl=60)
+
+ALL_CATEGORIES_TAG = 'category:*'
+
+
+def category_tag(category):
+    return f'category:{category.lower()}' if category else ALL_CATEGORIES_TAG
+
+
+def artist_tag(artist_id):
+    return f'artist:{artist_id}'
+
+
+def invalidate_artwork_cache(artwork, previous_category=None):
+    """Drop cached gallery data an artwork write could have changed"""
+    tags = {ALL_CATEGORIES_TAG, category_tag(artwork.category)}
+    if previous_category:
+        tags.add(category_tag(previous_category))
+    gallery_cache.invalidate(*tags)
+
+
+def invalidate_artist_cache(artist_id):
+    """Drop cached gallery data showing an artist's name"""
+    gallery_cache.invalidate(artist_tag(artist_id))
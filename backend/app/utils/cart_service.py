@@ -0,0 +1,411 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import select, literal, and_, delete, update, func, event, inspect, or_
+from sqlalchemy.orm import Session, selectinload
+from ..extensions import db
+from ..models.cart import Cart, CartItem, CartItemRemoval
+from ..models.artwork import Artwork
+from .helpers import dialect_insert, get_or_create_for_user
+
+# Most operations a single batch request may carry
+MAX_BATCH_OPERATIONS = 100
+
+# Every artwork is one of a kind, so a cart line always holds exactly one
+ONE_OF_A_KIND = 'artworks are one of a kind, quantity must be 1'
+
+# Artwork fields shown on cart lines; changing one re-versions the lines
+LINE_FIELDS = ('title', 'price', 'image_url', 'category', 'artist_id')
+
+CartSummary = namedtuple('CartSummary', ['item_count', 'subtotal', 'version'])
+CartVersion = namedtuple('CartVersion', ['cart_id', 'version'])
+
+
+class CartConflict(Exception):
+    """The cart moved past the version a conditional edit was based on"""
+
+    def __init__(self, version):
+        super().__init__(f'Cart is at version {version}')
+        self.version = version
+
+
+def cart_etag(version):
+    return f'"cart-{version}"'
+
+
+def parse_cart_etag(value):
+    """Cart version named by an ETag from cart_etag, or None if it is not one"""
+    tag = value.strip()
+    if tag.startswith('W/'):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    if not tag.startswith('cart-') or not tag[5:].isdigit():
+        return None
+    return int(tag[5:])
+
+
+def _refresh_summaries(connection, where):
+    """Recompute item_count and subtotal from cart_items for the matching carts"""
+    carts = Cart.__table__
+    items = CartItem.__table__
+    artworks = Artwork.__table__
+    item_count = select(func.coalesce(func.sum(items.c.quantity), 0)).\
+        where(items.c.cart_id == carts.c.id).\
+        scalar_subquery()
+    subtotal = select(func.coalesce(func.sum(items.c.quantity * artworks.c.price), 0)).\
+        select_from(items.join(artworks, artworks.c.id == items.c.artwork_id)).\
+        where(items.c.cart_id == carts.c.id).\
+        scalar_subquery()
+    connection.execute(update(carts).where(where).values(item_count=item_count, subtotal=subtotal))
+
+
+class CartService:
+    @staticmethod
+    def empty_cart(user_id):
+        """Unsaved cart shown to users who have never added anything"""
+        return Cart(user_id=user_id, item_count=0, subtotal=0, version=0)
+
+    @staticmethod
+    def summary(user_id) -> CartSummary:
+        """Item count, subtotal and version for the header badge, read from the cart row alone"""
+        row = db.session.execute(
+            select(Cart.item_count, Cart.subtotal, Cart.version).where(Cart.user_id == user_id)
+        ).first()
+        if row is None:
+            return CartSummary(0, 0, 0)
+        return CartSummary(row.item_count, row.subtotal, row.version)
+
+    @staticmethod
+    def claim_version(user_id, expected_version=None) -> CartVersion:
+        """Bump the cart version for an edit about to happen in this transaction.
+
+        Every mutation starts here, and the lines it writes are stamped with
+        the returned version. With `expected_version` the bump is a
+        conditional UPDATE, so of two edits based on the same version only
+        the first succeeds; the other raises CartConflict. The UPDATE also
+        locks the cart row until commit, which serializes concurrent edits.
+        A missing cart counts as version 0 and is created here.
+        """
+        carts = Cart.__table__
+        stmt = update(carts).\
+            where(carts.c.user_id == user_id).\
+            values(version=carts.c.version + 1).\
+            returning(carts.c.id, carts.c.version)
+        if expected_version is not None:
+            stmt = stmt.where(carts.c.version == expected_version)
+        row = db.session.execute(stmt).first()
+        if row is not None:
+            return CartVersion(row.id, row.version)
+
+        current = db.session.execute(select(carts.c.version).where(carts.c.user_id == user_id)).scalar()
+        if current is None and not expected_version:
+            get_or_create_for_user(Cart, user_id)
+            return CartService.claim_version(user_id, expected_version)
+        raise CartConflict(current or 0)
+
+    @staticmethod
+    def refresh_summary(user_id):
+        """Bring the user's stored cart summary in line with its lines.
+
+        Every path that writes cart_items calls this in the same transaction,
+        so the summary commits (or rolls back) together with the change.
+        """
+        db.session.flush()
+        _refresh_summaries(db.session.connection(), Cart.__table__.c.user_id == user_id)
+
+    @staticmethod
+    def summary_drift(limit=None):
+        """Carts whose stored summary disagrees with their lines.
+
+        Returns rows of `(id, user_id, item_count, subtotal, actual_count,
+        actual_subtotal)`.
+        """
+        lines = select(
+            CartItem.cart_id,
+            func.sum(CartItem.quantity).label('item_count'),
+            func.sum(CartItem.quantity * Artwork.price).label('subtotal')
+        ).join(Artwork, Artwork.id == CartItem.artwork_id).group_by(CartItem.cart_id).subquery()
+        actual_count = func.coalesce(lines.c.item_count, 0)
+        actual_subtotal = func.coalesce(lines.c.subtotal, 0)
+        query = select(
+            Cart.id, Cart.user_id, Cart.item_count, Cart.subtotal,
+            actual_count.label('actual_count'), actual_subtotal.label('actual_subtotal')
+        ).outerjoin(lines, lines.c.cart_id == Cart.id).where(or_(
+            Cart.item_count != actual_count, Cart.subtotal != actual_subtotal
+        )).order_by(Cart.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return db.session.execute(query).all()
+
+    @staticmethod
+    def repair_summaries(cart_ids):
+        _refresh_summaries(db.session.connection(), Cart.__table__.c.id.in_(cart_ids))
+
+    @staticmethod
+    def load_cart(user_id):
+        """The user's cart with its items loaded, or None"""
+        # Lines may have been written with Core statements; always reload them
+        return Cart.query.\
+            options(selectinload(Cart.items)).\
+            execution_options(populate_existing=True).\
+            filter_by(user_id=user_id).\
+            first()
+
+    @staticmethod
+    def load_changes(user_id, since_version):
+        """`(cart, items, removed)` changed after `since_version`.
+
+        `items` are the lines written after that version; `removed` are the artwork ids of lines deleted since
+        and not added back. The cart is None for users without one.
+        """
+        cart = Cart.query.execution_options(populate_existing=True).filter_by(user_id=user_id).first()
+        if cart is None:
+            return None, [], []
+        items = CartItem.query.\
+            execution_options(populate_existing=True).\
+            filter(CartItem.cart_id == cart.id, CartItem.version > since_version).\
+            all()
+        present = {item.artwork_id for item in items}
+        removed = db.session.execute(
+            select(CartItemRemoval.artwork_id).
+            where(CartItemRemoval.cart_id == cart.id, CartItemRemoval.version > since_version)
+        ).scalars().all()
+        return cart, items, [artwork_id for artwork_id in removed if artwork_id not in present]
+
+    @staticmethod
+    def _upsert_item(cart_id, artwork_id, version):
+        """Ensure a line for the artwork.
+
+        Returns True if the line is new, False if it was already there, or
+        None if the artwork is missing or unavailable.
+        """
+        items = CartItem.__table__
+        artworks = Artwork.__table__
+        line_id = uuid.uuid4()
+
+        # One row if the artwork exists and is available, none otherwise
+        source = select(
+            literal(line_id, items.c.id.type),
+            literal(cart_id, items.c.cart_id.type),
+            artworks.c.id,
+            literal(1, items.c.quantity.type),
+            literal(datetime.utcnow(), items.c.added_at.type),
+            literal(version, items.c.version.type)
+        ).where(artworks.c.id == artwork_id, artworks.c.is_available == True)
+
+        stmt = dialect_insert(items).from_select(
+            ['id', 'cart_id', 'artwork_id', 'quantity', 'added_at', 'version'], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['cart_id', 'artwork_id'],
+            set_={'quantity': 1, 'version': stmt.excluded.version}
+        ).returning(items.c.id)
+        returned = db.session.execute(stmt).scalar()
+        # An existing line keeps its own id, so only a fresh insert returns ours
+        return None if returned is None else returned == line_id
+
+    @staticmethod
+    def _record_removals(cart_id, artwork_ids, version):
+        removals = CartItemRemoval.__table__
+        stmt = dialect_insert(removals).values([
+            {'id': uuid.uuid4(), 'cart_id': cart_id, 'artwork_id': artwork_id, 'version': version}
+            for artwork_id in artwork_ids
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['cart_id', 'artwork_id'],
+            set_={'version': stmt.excluded.version}
+        ))
+
+    @staticmethod
+    def _remove_lines(cart_id, artwork_ids, version):
+        """Delete lines and leave tombstones for them; returns the removed artwork ids"""
+        items = CartItem.__table__
+        removed = db.session.execute(
+            delete(items).
+            where(items.c.cart_id == cart_id, items.c.artwork_id.in_(artwork_ids)).
+            returning(items.c.artwork_id)
+        ).scalars().all()
+        if removed:
+            CartService._record_removals(cart_id, removed, version)
+        return removed
+
+    @staticmethod
+    def take_lines(user_id, expected_version=None):
+        """Empty the cart for checkout and return its lines.
+
+        One DELETE ... RETURNING reads and removes every line, in the
+        transaction that places the order, so a failed checkout rolls the
+        cart back untouched. Returns `(artwork_id, quantity)` rows in the
+        order they were added.
+        """
+        cart_id, version = CartService.claim_version(user_id, expected_version)
+        items = CartItem.__table__
+        lines = db.session.execute(
+            delete(items).
+            where(items.c.cart_id == cart_id).
+            returning(items.c.artwork_id, items.c.quantity, items.c.added_at)
+        ).all()
+        if lines:
+            CartService._record_removals(cart_id, [line.artwork_id for line in lines], version)
+            CartService.refresh_summary(user_id)
+        return sorted(lines, key=lambda line: (line.added_at is None, line.added_at))
+
+    @staticmethod
+    def add_item(user_id, artwork_id, expected_version=None):
+        """Put an artwork in the user's cart.
+
+        The availability check and insert are a single INSERT ... SELECT ...
+        ON CONFLICT DO UPDATE on (cart_id, artwork_id), so concurrent or
+        repeated adds leave one line with a quantity of 1. Returns True when
+        a new line was added, False when the artwork was already in the cart,
+        or None if it is missing or unavailable.
+        """
+        try:
+            artwork_id = uuid.UUID(str(artwork_id))
+        except ValueError:
+            raise ValueError('Invalid artwork ID format')
+
+        cart_id, version = CartService.claim_version(user_id, expected_version)
+        added = CartService._upsert_item(cart_id, artwork_id, version)
+        if added is not None:
+            CartService.refresh_summary(user_id)
+        return added
+
+    @staticmethod
+    def update_item(user_id, artwork_id, quantity, expected_version=None):
+        """Set an existing line's quantity to 1, or 0 to remove it. Returns False if there is no such line."""
+        try:
+            artwork_id = uuid.UUID(str(artwork_id))
+        except ValueError:
+            raise ValueError('Invalid artwork ID format')
+        if quantity not in (0, 1):
+            raise ValueError(ONE_OF_A_KIND)
+
+        cart_id, version = CartService.claim_version(user_id, expected_version)
+        if quantity == 0:
+            found = bool(CartService._remove_lines(cart_id, [artwork_id], version))
+        else:
+            items = CartItem.__table__
+            found = db.session.execute(
+                update(items).
+                where(items.c.cart_id == cart_id, items.c.artwork_id == artwork_id).
+                values(quantity=1, version=version)
+            ).rowcount == 1
+        if found:
+            CartService.refresh_summary(user_id)
+        return found
+
+    @staticmethod
+    def plan_operations(operations):
+        """Validate batch operations and fold them into one change per artwork.
+
+        Operations are `{"op": "add" | "set" | "remove", "artworkId": ...,
+        "quantity": n}` and apply in order. Artworks are one of a kind, so
+        adds take a quantity of 1 and sets 0 or 1. Returns `{artwork_id:
+        quantity}` with each artwork's final quantity (0 removes the line).
+        """
+        if not isinstance(operations, list) or not operations:
+            raise ValueError('operations must be a non-empty list')
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise ValueError(f'At most {MAX_BATCH_OPERATIONS} operations per batch')
+
+        changes = {}
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                raise ValueError(f'Operation {index} must be an object')
+            op = operation.get('op')
+            try:
+                artwork_id = uuid.UUID(str(operation.get('artworkId')))
+            except ValueError:
+                raise ValueError(f'Operation {index} has an invalid artworkId')
+
+            quantity = operation.get('quantity', 1 if op == 'add' else None)
+            if op == 'remove':
+                quantity = 0
+            elif op not in ('add', 'set'):
+                raise ValueError(f'Operation {index} must be add, set or remove')
+            elif not isinstance(quantity, int) or isinstance(quantity, bool) or \
+                    quantity not in ((1,) if op == 'add' else (0, 1)):
+                raise ValueError(f'Operation {index}: {ONE_OF_A_KIND}')
+
+            changes[artwork_id] = quantity
+        return changes
+
+    @staticmethod
+    def _upsert_lines(cart_id, artwork_ids, version):
+        items = CartItem.__table__
+        now = datetime.utcnow()
+        stmt = dialect_insert(items).values([
+            {'id': uuid.uuid4(), 'cart_id': cart_id, 'artwork_id': artwork_id,
+             'quantity': 1, 'added_at': now, 'version': version}
+            for artwork_id in artwork_ids
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['cart_id', 'artwork_id'],
+            set_={'quantity': 1, 'version': stmt.excluded.version}
+        ))
+
+    @staticmethod
+    def apply_operations(user_id, changes, expected_version=None):
+        """Apply a planned batch with set-based statements in the current transaction.
+
+        One read checks availability and existing lines for every artwork
+        being added or set, then one DELETE and one multi-row upsert write
+        the result, all under a single cart version. Returns
+        `(new_lines, unavailable)`; nothing is written when any artwork is
+        unavailable.
+        """
+        removals = [artwork_id for artwork_id, quantity in changes.items() if quantity == 0]
+        wanted = [artwork_id for artwork_id, quantity in changes.items() if quantity]
+
+        cart_id, version = CartService.claim_version(user_id, expected_version)
+        existing = {}
+        if wanted:
+            rows = db.session.execute(
+                select(Artwork.id, CartItem.id.label('line_id')).
+                outerjoin(CartItem, and_(CartItem.artwork_id == Artwork.id, CartItem.cart_id == cart_id)).
+                where(Artwork.id.in_(wanted), Artwork.is_available == True)
+            ).all()
+            existing = {row.id: row.line_id is not None for row in rows}
+            unavailable = [artwork_id for artwork_id in wanted if artwork_id not in existing]
+            if unavailable:
+                return [], unavailable
+
+        if removals:
+            CartService._remove_lines(cart_id, removals, version)
+        if wanted:
+            CartService._upsert_lines(cart_id, wanted, version)
+        CartService.refresh_summary(user_id)
+        return [artwork_id for artwork_id in wanted if not existing[artwork_id]], []
+
+def _after_flush(session, flush_context):
+    """Re-version and re-price cart lines whose artwork changed.
+
+    Lines show the artwork's title, price and image, so delta clients must
+    see them again, and subtotals follow the new price.
+    """
+    changed = []
+    for obj in session.dirty:
+        if isinstance(obj, Artwork):
+            attrs = inspect(obj).attrs
+            if any(getattr(attrs, field).history.has_changes() for field in LINE_FIELDS):
+                changed.append(obj.id)
+    if not changed:
+        return
+
+    connection = session.connection()
+    carts = Cart.__table__
+    items = CartItem.__table__
+    affected = carts.c.id.in_(select(items.c.cart_id).where(items.c.artwork_id.in_(changed)))
+    connection.execute(update(carts).where(affected).values(version=carts.c.version + 1))
+    connection.execute(
+        update(items).
+        where(items.c.artwork_id.in_(changed)).
+        values(version=select(carts.c.version).where(carts.c.id == items.c.cart_id).scalar_subquery())
+    )
+    _refresh_summaries(connection, affected)
+
+
+def register_cart_summaries():
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1,87 @@
+from collections import namedtuple
+from datetime import datetime
+from sqlalchemy import event, inspect, select, update, insert
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.artwork import Artwork
+from ..models.catalog import CatalogState
+from ..models.user import User
+
+CATALOG_ROW_ID = 1
+
+CatalogVersion = namedtuple('CatalogVersion', ['version', 'updated_at'])
+
+
+class Catalog:
+    @staticmethod
+    def current() -> CatalogVersion:
+        """Read the catalog version stamp (a single primary-key lookup)"""
+        row = db.session.execute(
+            select(CatalogState.version, CatalogState.updated_at).where(CatalogState.id == CATALOG_ROW_ID)
+        ).first()
+        if row is None:
+            return CatalogVersion(version=0, updated_at=None)
+        return CatalogVersion(version=row.version, updated_at=row.updated_at)
+
+    @staticmethod
+    def bump(connection):
+        """Advance the version inside the caller's transaction"""
+        table = CatalogState.__table__
+        now = datetime.utcnow()
+        result = connection.execute(
+            update(table).
+            where(table.c.id == CATALOG_ROW_ID).
+            values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(id=CATALOG_ROW_ID, version=1, updated_at=now))
+
+    @staticmethod
+    def touch(session):
+        """Mark the session's transaction as changing the catalog.
+
+        The version is bumped once, as the last statement before commit.
+        Every catalog write updates the same row, so bumping early would hold
+        that row's lock for the rest of the transaction and queue unrelated
+        writers (checkouts of other artworks) behind it.
+        """
+        session.info['catalog_changed'] = True
+
+
+def _after_flush(session, flush_context):
+    """Note the catalog changed whenever an artwork row or an artist's name changes"""
+    changed = any(isinstance(obj, Artwork) for obj in session.new) or \
+        any(isinstance(obj, Artwork) for obj in session.deleted)
+    if not changed:
+        for obj in session.dirty:
+            if isinstance(obj, Artwork) and any(
+                attr.history.has_changes() for attr in inspect(obj).attrs
+            ):
+                changed = True
+                break
+            # Gallery payloads show the artist's username
+            if isinstance(obj, User) and inspect(obj).attrs.username.history.has_changes():
+                changed = True
+                break
+    if changed:
+        Catalog.touch(session)
+
+
+def _before_commit(session):
+    # The commit's own flush runs after this hook, so flush here to see (and
+    # get ahead of) pending artwork writes; the bump is then the last write
+    session.flush()
+    if session.info.pop('catalog_changed', None):
+        Catalog.bump(session.connection())
+
+
+def _after_rollback(session):
+    session.info.pop('catalog_changed', None)
+
+
+def register_catalog_version():
+    for name, listener in (('after_flush', _after_flush),
+                           ('before_commit', _before_commit),
+                           ('after_rollback', _after_rollback)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
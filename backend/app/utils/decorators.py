@@ -1,7 +1,6 @@
 from functools import wraps
-from flask_jwt_extended import get_jwt_identity, jwt_required
-from ..models.user import User
-from ..extensions import db
+from flask_jwt_extended import jwt_required
+from .identity import current_identity, load_current_user
 
 
 def jwt_required_and_get_user():
@@ -11,8 +10,7 @@ def jwt_required_and_get_user():
         @jwt_required()
         def wrapper(*args, **kwargs):
             try:
-                user_id = get_jwt_identity()  # This is now a string UUID
-                user = db.session.get(User, user_id)
+                user = load_current_user()
                 if not user:
                     return {"message": "User not found"}, 404
                 if not user.is_active:
@@ -25,21 +23,20 @@ def jwt_required_and_get_user():
 
 
 def role_required(roles):
-    """Decorator to restrict access by user role"""
+    """Decorator to restrict access by user role (checked against the cached identity)"""
     def decorator(fn):
         @wraps(fn)
         @jwt_required()
         def wrapper(*args, **kwargs):
             try:
-                user_id = get_jwt_identity()
-                user = db.session.get(User, user_id)
-                if not user:
+                identity = current_identity()
+                if not identity:
                     return {"message": "User not found"}, 404
-                if not user.is_active:
+                if not identity.is_active:
                     return {"message": "Account is deactivated"}, 403
-                if user.role not in roles:
+                if identity.role not in roles:
                     return {"message": "Insufficient permissions"}, 403
-                return fn(user, *args, **kwargs)
+                return fn(*args, **kwargs)
             except Exception as e:
                 return {"message": f"Authorization failed: {str(e)}"}, 401
         return wrapper
@@ -1,4 +1,14 @@
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
 from flask_sqlalchemy import pagination
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from ..extensions import db
+
+KeysetPage = namedtuple('KeysetPage', ['items', 'next_cursor'])
 
 def paginate_query(query, page: int = 1, per_page: int = 20):
     page = max(1, int(page))
@@ -6,6 +16,98 @@ def paginate_query(query, page: int = 1, per_page: int = 20):
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     return pagination
 
+def sort_clauses(keys):
+    """ORDER BY clauses for a list of (column, descending) sort keys"""
+    return [column.desc() if descending else column.asc() for column, descending in keys]
+
+def encode_cursor(values, scope: str = '') -> str:
+    """Pack sort key values into an opaque, URL-safe cursor token"""
+    raw = json.dumps({'s': scope, 'k': values}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(token: str, scope: str = '') -> list:
+    """Unpack a cursor token, rejecting tokens issued for another sort"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload['k']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if payload.get('s') != scope or not isinstance(values, list):
+        raise ValueError('Cursor does not match the requested sort')
+    return values
+
+def _dump_key(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value) if value is not None else None
+
+def _load_key(column, value):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+def _seek_predicate(keys, values):
+    # (k1 after v1) OR (k1 = v1 AND k2 after v2) OR ...
+    clauses = []
+    for i, (column, descending) in enumerate(keys):
+        ties = [keys[j][0] == values[j] for j in range(i)]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*ties, step))
+    return or_(*clauses)
+
+def keyset_paginate(query, keys, cursor: str = None, per_page: int = 20, scope: str = ''):
+    """Seek to the page after `cursor` instead of using OFFSET and COUNT(*).
+
+    `keys` is a list of (column, descending) pairs that must end with a unique
+    column (the primary key) so the ordering is total. The cost of a page does
+    not depend on how deep it is.
+    """
+    per_page = max(1, int(per_page))
+
+    if cursor:
+        values = decode_cursor(cursor, scope)
+        if len(values) != len(keys):
+            raise ValueError('Invalid cursor')
+        try:
+            values = [_load_key(column, value) for (column, _), value in zip(keys, values)]
+        except (ValueError, TypeError):
+            raise ValueError('Invalid cursor')
+        query = query.filter(_seek_predicate(keys, values))
+
+    rows = query.order_by(None).order_by(*sort_clauses(keys)).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1][0] if isinstance(rows[-1], Row) else rows[-1]
+        next_cursor = encode_cursor([_dump_key(getattr(last, column.key)) for column, _ in keys], scope)
+
+    return KeysetPage(items=rows, next_cursor=next_cursor)
+
+def dialect_insert(model):
+    """INSERT construct with ON CONFLICT support for the session's database"""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def get_or_create_for_user(model, user_id):
+    """Fetch the per-user row of `model` (cart, wishlist), creating it if needed.
+
+    Creation is INSERT ... ON CONFLICT DO NOTHING against the unique user_id,
+    so concurrent first mutations converge on one row instead of failing.
+    """
+    instance = model.query.filter_by(user_id=user_id).first()
+    if instance is None:
+        db.session.execute(
+            dialect_insert(model).
+            values(user_id=user_id).
+            on_conflict_do_nothing(index_elements=['user_id'])
+        )
+        instance = model.query.filter_by(user_id=user_id).one()
+    return instance
+
 def validate_email(email: str) -> bool:
     import re
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -0,0 +1,34 @@
+import hashlib
+from flask import request, Response
+from werkzeug.http import http_date
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag value derived from the given version parts"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def is_not_modified(etag: str, last_modified=None) -> bool:
+    """True when the request's validators show the client copy is current.
+
+    If-None-Match wins when present; If-Modified-Since is only consulted
+    without it, compared at the one-second resolution of HTTP dates.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains(etag.strip('"'))
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def cache_headers(etag: str, last_modified=None) -> dict:
+    """Validator headers for a revalidatable public response"""
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def not_modified(etag: str, last_modified=None) -> Response:
+    return Response(status=304, headers=cache_headers(etag, last_modified))
@@ -0,0 +1,115 @@
+import uuid
+from collections import namedtuple
+from flask import current_app, g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.user import User
+from .cache import ResponseCache, invalidate_artist_cache
+
+Identity = namedtuple('Identity', ['id', 'role', 'is_active'])
+
+# Role and active state per user id, shared across requests. Entries are
+# tagged `user:<id>` and dropped when that user row changes.
+identity_cache = ResponseCache(maxsize=4096, ttl=300)
+
+
+def user_tag(user_id):
+    return f'user:{user_id}'
+
+
+def identity_claims(user):
+    """Extra access token claims so role checks can skip the database"""
+    return {'role': user.role, 'is_active': bool(user.is_active)}
+
+
+def _load_identity(user_id):
+    try:
+        key = uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+    row = db.session.execute(
+        select(User.role, User.is_active).where(User.id == key)
+    ).first()
+    if row is None:
+        return None
+    return Identity(id=str(user_id), role=row.role, is_active=bool(row.is_active))
+
+
+def current_identity():
+    """Identity of the user behind the current JWT, or None if they no longer exist.
+
+    Resolved at most once per request. Role claims in the token are
+    used when `JWT_TRUST_IDENTITY_CLAIMS` is on; otherwise (or for tokens
+    issued without them) the identity comes from `identity_cache`, which only
+    reads the two columns it needs on a miss.
+    """
+    # The decoded token is a fresh object per request, so it keys the memo
+    claims = get_jwt()
+    memo = g.get('_identity_memo')
+    if memo is not None and memo[0] is claims:
+        return memo[1]
+
+    user_id = get_jwt_identity()
+    if current_app.config['JWT_TRUST_IDENTITY_CLAIMS'] and 'role' in claims and 'is_active' in claims:
+        identity = Identity(id=user_id, role=claims['role'], is_active=claims['is_active'])
+    else:
+        identity = identity_cache.get_or_compute(
+            user_id,
+            lambda: (_load_identity(user_id), {user_tag(user_id)})
+        )
+
+    g._identity_memo = (claims, identity)
+    return identity
+
+
+def current_user_id():
+    """The current JWT's user id as a UUID, ready to bind to UUID columns on any engine"""
+    return uuid.UUID(str(get_jwt_identity()))
+
+
+def load_current_user():
+    """Full User row for the current JWT (served from the session identity map once loaded)"""
+    try:
+        return db.session.get(User, uuid.UUID(str(get_jwt_identity())))
+    except ValueError:
+        return None
+
+
+def _after_flush(session, flush_context):
+    """Remember which users changed so caches can be dropped on commit"""
+    changed = session.info.setdefault('changed_users', {})
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changed[obj.id] = True
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = inspect(obj)
+            if state.attrs.role.history.has_changes() or state.attrs.is_active.history.has_changes():
+                changed.setdefault(obj.id, False)
+            if state.attrs.username.history.has_changes():
+                changed[obj.id] = True
+
+
+def _after_commit(session):
+    changed = session.info.pop('changed_users', None)
+    if not changed:
+        return
+    identity_cache.invalidate(*(user_tag(user_id) for user_id in changed))
+    for user_id, renamed in changed.items():
+        if renamed:
+            # Gallery payloads show the artist's username
+            invalidate_artist_cache(user_id)
+
+
+def _after_rollback(session):
+    session.info.pop('changed_users', None)
+
+
+def register_identity_cache():
+    for name, listener in (('after_flush', _after_flush),
+                           ('after_commit', _after_commit),
+                           ('after_rollback', _after_rollback)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
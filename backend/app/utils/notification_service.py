@@ -1,20 +1,30 @@
+import uuid
 from ..extensions import db
 from ..models.notification import Notification
 from ..models.user import User
 from ..models.artwork import Artwork
+from ..models.order import Order
+from .email_service import EmailService
+from .outbox import outbox
 
 class NotificationService:
+    @staticmethod
+    def add_notification(user_id, title, message, notification_type="info"):
+        """Add a notification to the current transaction without committing"""
+        notification = Notification(
+            user_id=user_id,
+            title=title,
+            message=message,
+            type=notification_type
+        )
+        db.session.add(notification)
+        return notification
+
     @staticmethod
     def create_notification(user_id, title, message, notification_type="info"):
         """Create a new notification for a user"""
         try:
-            notification = Notification(
-                user_id=user_id,
-                title=title,
-                message=message,
-                type=notification_type
-            )
-            db.session.add(notification)
+            notification = NotificationService.add_notification(user_id, title, message, notification_type)
             db.session.commit()
             return notification
         except Exception as e:
@@ -23,11 +33,11 @@ class NotificationService:
 
     @staticmethod
     def notify_order_placed(order):
-        """Notify artists when their artwork is ordered"""
+        """Notify artists when their artwork is ordered (committed by the caller)"""
         for item in order.items:
             artwork = item.artwork
             if artwork and artwork.artist_id:
-                NotificationService.create_notification(
+                NotificationService.add_notification(
                     user_id=artwork.artist_id,
                     title="New Order Received",
                     message=f"Your artwork '{artwork.title}' has been ordered by a collector.",
@@ -36,8 +46,8 @@ class NotificationService:
 
     @staticmethod
     def notify_order_status_change(order, new_status):
-        """Notify collector when order status changes"""
-        NotificationService.create_notification(
+        """Notify collector when order status changes (committed by the caller)"""
+        NotificationService.add_notification(
             user_id=order.customer_id,
             title="Order Status Updated",
             message=f"Your order #{str(order.id)[:8]} status has been updated to {new_status}.",
@@ -47,7 +57,7 @@ class NotificationService:
     @staticmethod
     def notify_artwork_added_to_cart(artwork_id, collector_id):
         """Notify artist when their artwork is added to cart"""
-        artwork = Artwork.query.get(artwork_id)
+        artwork = db.session.get(Artwork, uuid.UUID(str(artwork_id)))
         if artwork and artwork.artist_id:
             NotificationService.create_notification(
                 user_id=artwork.artist_id,
@@ -59,7 +69,7 @@ class NotificationService:
     @staticmethod
     def notify_artwork_added_to_wishlist(artwork_id, collector_id):
         """Notify artist when their artwork is wishlisted"""
-        artwork = Artwork.query.get(artwork_id)
+        artwork = db.session.get(Artwork, uuid.UUID(str(artwork_id)))
         if artwork and artwork.artist_id:
             NotificationService.create_notification(
                 user_id=artwork.artist_id,
@@ -80,11 +90,11 @@ class NotificationService:
 
     @staticmethod
     def notify_payment_received(order):
-        """Notify artists when payment is received for their artwork"""
+        """Notify artists when payment is received for their artwork (committed by the caller)"""
         for item in order.items:
             artwork = item.artwork
             if artwork and artwork.artist_id:
-                NotificationService.create_notification(
+                NotificationService.add_notification(
                     user_id=artwork.artist_id,
                     title="Payment Received",
                     message=f"Payment has been received for your artwork '{artwork.title}'.",
@@ -93,15 +103,59 @@ class NotificationService:
 
     @staticmethod
     def notify_welcome(user_id, user_role):
-        """Send welcome notification to new users"""
+        """Welcome notification for a new user (committed by the caller)"""
         if user_role == 'artist':
             message = "Welcome to ArtMarket! Start uploading your artworks to reach collectors worldwide."
         else:
             message = "Welcome to ArtMarket! Discover amazing artworks from talented artists."
         
-        NotificationService.create_notification(
+        NotificationService.add_notification(
             user_id=user_id,
             title="Welcome to ArtMarket!",
             message=message,
             notification_type="welcome"
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def enqueue_order_placed(order):
+        """Record an order's artist notifications and confirmation email in its transaction"""
+        outbox.enqueue('order.notify_artists', order_id=str(order.id))
+        outbox.enqueue('order.confirmation_email', order_id=str(order.id))
+
+    @staticmethod
+    def enqueue_welcome(user_id, email, full_name, user_role):
+        """Record a new account's welcome notification and email in its transaction"""
+        outbox.enqueue('user.welcome', user_id=str(user_id), role=user_role)
+        outbox.enqueue('user.welcome_email', email=email, full_name=full_name, role=user_role)
+
+
+# Outbox handlers: each runs in the dispatcher's transaction and must not commit
+
+@outbox.handler('order.notify_artists')
+def _notify_order_artists(payload):
+    order = db.session.get(Order, uuid.UUID(payload['order_id']))
+    if order is not None:
+        NotificationService.notify_order_placed(order)
+        NotificationService.notify_payment_received(order)
+
+
+@outbox.handler('order.confirmation_email')
+def _send_order_confirmation(payload):
+    order = db.session.get(Order, uuid.UUID(payload['order_id']))
+    if order is None:
+        return
+    customer = db.session.get(User, order.customer_id)
+    if customer and customer.email:
+        if not EmailService.send_order_confirmation(customer.email, order):
+            raise RuntimeError(f'Order confirmation email to {customer.email} was not accepted')
+
+
+@outbox.handler('user.welcome')
+def _notify_welcome(payload):
+    NotificationService.notify_welcome(uuid.UUID(payload['user_id']), payload['role'])
+
+
+@outbox.handler('user.welcome_email')
+def _send_welcome_email(payload):
+    if not EmailService.send_welcome_email(payload['email'], payload['full_name'], payload['role']):
+        raise RuntimeError(f"Welcome email to {payload['email']} was not accepted")
@@ -0,0 +1,171 @@
+import uuid
+from sqlalchemy import select, update, exists
+from ..extensions import db
+from ..models.order import Order, OrderItem
+from ..models.artwork import Artwork
+from .catalog import Catalog
+from .cache import invalidate_artwork_cache
+from .notification_service import NotificationService
+
+# Most lines a single order may carry
+MAX_ORDER_LINES = 100
+
+SHIPPING_FIELDS = ['fullName', 'address', 'city', 'country', 'postalCode']
+
+
+def _as_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def customer_owns_order(customer_id):
+    """SQL predicate on Order: placed by `customer_id`"""
+    return Order.customer_id == _as_uuid(customer_id)
+
+
+def artist_has_line(artist_id):
+    """SQL predicate on Order: holds a line for one of `artist_id`'s artworks.
+
+    An uncorrelated IN, so the lookup starts from the artist's artworks
+    (ix_artworks_artist_id, ix_order_items_artwork_id) instead of probing
+    every order with an EXISTS.
+    """
+    return Order.id.in_(
+        select(OrderItem.order_id).
+        join(Artwork, Artwork.id == OrderItem.artwork_id).
+        where(Artwork.artist_id == _as_uuid(artist_id))
+    )
+
+
+def order_access(identity):
+    """SQL predicate on Order for the orders `identity` may see and update.
+
+    Artists reach orders holding their artworks, everyone else the orders
+    they placed. Use it to filter listings or fold the check into a fetch.
+    """
+    if identity.role == 'artist':
+        return artist_has_line(identity.id)
+    return customer_owns_order(identity.id)
+
+
+class OrderService:
+    @staticmethod
+    def find_accessible(order_id, identity, *options):
+        """Fetch an order `identity` may act on, with the access check in the same query.
+
+        Returns None when the order does not exist and raises
+        PermissionError when it exists but is out of reach; neither case
+        loads the order's items or artworks.
+        """
+        try:
+            order_id = _as_uuid(order_id)
+        except ValueError:
+            return None
+        order = Order.query.options(*options).filter(Order.id == order_id, order_access(identity)).first()
+        if order is not None:
+            return order
+        if db.session.execute(select(exists().where(Order.id == order_id))).scalar():
+            raise PermissionError('Access denied')
+        return None
+
+    @staticmethod
+    def plan_lines(items):
+        """Validate requested order lines; returns the artwork ids in request order.
+
+        Lines are `{"artwork_id": ..., "quantity": 1}`. Every artwork is one
+        of a kind, so each may appear once with a quantity of 1.
+        """
+        if not isinstance(items, list) or not items:
+            raise ValueError('Order items are required')
+        if len(items) > MAX_ORDER_LINES:
+            raise ValueError(f'At most {MAX_ORDER_LINES} items per order')
+
+        artwork_ids = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f'Item {index} must be an object')
+            try:
+                artwork_id = uuid.UUID(str(item.get('artwork_id')))
+            except ValueError:
+                raise ValueError(f'Item {index} has an invalid artwork_id')
+            quantity = item.get('quantity', 1)
+            if quantity != 1 or isinstance(quantity, bool):
+                raise ValueError(f'Item {index}: artworks are one of a kind, quantity must be 1')
+            if artwork_id in artwork_ids:
+                raise ValueError(f'Artwork {artwork_id} appears more than once')
+            artwork_ids.append(artwork_id)
+        return artwork_ids
+
+    @staticmethod
+    def reserve_artworks(artwork_ids):
+        """Mark the artworks sold in the current transaction, all or nothing.
+
+        Postgres locks the rows with one SELECT ... FOR UPDATE (in id order,
+        so concurrent checkouts cannot deadlock), checks them, then flips
+        them in one UPDATE. SQLite has no row locks: there the flip is a
+        single UPDATE ... WHERE is_available, which takes the database write
+        lock first, so a racing checkout sees the pieces already sold.
+        Returns `(artworks, unavailable)` where `artworks` maps id to a row
+        of (id, price, category, artist_id); the caller must roll back when
+        `unavailable` is not empty.
+        """
+        artworks = Artwork.__table__
+        columns = (artworks.c.id, artworks.c.price, artworks.c.category, artworks.c.artist_id)
+        sell = update(artworks).where(artworks.c.id.in_(artwork_ids))
+
+        if db.session.get_bind().dialect.name == 'postgresql':
+            rows = db.session.execute(
+                select(*columns, artworks.c.is_available).
+                where(artworks.c.id.in_(artwork_ids)).
+                order_by(artworks.c.id).
+                with_for_update()
+            ).all()
+            found = {row.id: row for row in rows if row.is_available}
+            unavailable = [artwork_id for artwork_id in artwork_ids if artwork_id not in found]
+            if unavailable:
+                return {}, unavailable
+            db.session.execute(sell.values(is_available=False))
+        else:
+            rows = db.session.execute(
+                sell.where(artworks.c.is_available == True).
+                values(is_available=False).
+                returning(*columns)
+            ).all()
+            found = {row.id: row for row in rows}
+            unavailable = [artwork_id for artwork_id in artwork_ids if artwork_id not in found]
+            if unavailable:
+                return {}, unavailable
+
+        # Core writes skip the ORM hook that versions the catalog; the bump
+        # itself waits for commit so checkouts don't queue on the stamp row
+        Catalog.touch(db.session)
+        return found, []
+
+    @staticmethod
+    def create_order(customer_id, artwork_ids, artworks, shipping_details):
+        """Add an order for reserved artworks, priced from the reserved rows.
+
+        The order's side effects (artist notifications, confirmation email)
+        are enqueued in the same transaction and delivered after commit.
+        """
+        order = Order(
+            customer_id=customer_id,
+            total_amount=sum(artworks[artwork_id].price for artwork_id in artwork_ids),
+            shipping_address=shipping_details['address'],
+            shipping_city=shipping_details['city'],
+            shipping_country=shipping_details['country'],
+            shipping_postal_code=shipping_details['postalCode'],
+            items=[
+                OrderItem(artwork_id=artwork_id, quantity=1, price=artworks[artwork_id].price)
+                for artwork_id in artwork_ids
+            ]
+        )
+        db.session.add(order)
+        db.session.flush()
+        NotificationService.enqueue_order_placed(order)
+        return order
+
+    @staticmethod
+    def invalidate_sold(artworks):
+        """Drop cached gallery data for artworks sold by a committed order"""
+        for row in {row.category: row for row in artworks.values()}.values():
+            invalidate_artwork_cache(row)
@@ -0,0 +1,171 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.outbox import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """Delivers side effects recorded as outbox rows.
+
+    enqueue() adds a message to the current transaction, so it commits or
+    rolls back with the change that caused it. After a commit that enqueued
+    something, a dispatcher thread wakes and runs each message's handler in
+    its own transaction, marking it sent in that same transaction. A failed
+    handler is retried with exponential backoff until `max_attempts`, after
+    which the message is left as `failed`. Handlers must not commit.
+
+    The thread also starts on the first request a process serves, so
+    messages left pending or in backoff by an earlier process are delivered
+    without waiting for a new one to be enqueued.
+
+    With `worker` off no thread is started; run `flask outbox work` as a
+    separate process instead. On Postgres, dispatchers claim messages with
+    FOR UPDATE SKIP LOCKED, so any number of them can run side by side.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.handlers = {}
+        self.worker = False
+        self.poll_interval = 5
+        self.max_attempts = 8
+        self.retry_delay = 30
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.worker = app.config['OUTBOX_WORKER']
+        self.poll_interval = app.config['OUTBOX_POLL_INTERVAL']
+        self.max_attempts = app.config['OUTBOX_MAX_ATTEMPTS']
+        self.retry_delay = app.config['OUTBOX_RETRY_DELAY']
+        for name, listener in (('after_commit', _after_commit), ('after_rollback', _after_rollback)):
+            if not event.contains(Session, name, listener):
+                event.listen(Session, name, listener)
+        # Not at import time: CLI commands (migrations included) build the
+        # app too, and pre-fork servers would lose the thread in the fork
+        app.before_request(self.start)
+
+    def handler(self, topic):
+        """Register the function that delivers messages of `topic`"""
+        def register(fn):
+            self.handlers[topic] = fn
+            return fn
+        return register
+
+    def enqueue(self, topic, **payload):
+        db.session.add(OutboxMessage(topic=topic, payload=payload))
+        db.session.info['outbox_enqueued'] = True
+
+    def _retry_at(self, attempts, now):
+        delay = min(self.retry_delay * 2 ** (attempts - 1), 3600)
+        return now + timedelta(seconds=delay)
+
+    def dispatch_one(self) -> bool:
+        """Deliver the oldest due message; False when none is due"""
+        now = datetime.utcnow()
+        message = db.session.execute(
+            select(OutboxMessage).
+            where(OutboxMessage.status == 'pending', OutboxMessage.available_at <= now).
+            order_by(OutboxMessage.available_at).
+            limit(1).
+            with_for_update(skip_locked=True)
+        ).scalar()
+        if message is None:
+            db.session.rollback()
+            return False
+
+        message_id, topic, payload = message.id, message.topic, message.payload
+        try:
+            handler = self.handlers.get(topic)
+            if handler is None:
+                raise LookupError(f'No outbox handler for {topic!r}')
+            handler(payload)
+            message.status = 'sent'
+            message.attempts += 1
+            message.processed_at = datetime.utcnow()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            message = db.session.get(OutboxMessage, message_id)
+            message.attempts += 1
+            message.last_error = f'{type(e).__name__}: {e}'[:2000]
+            if message.attempts >= self.max_attempts:
+                message.status = 'failed'
+                logger.error('Outbox message %s (%s) failed for good: %s', message_id, topic, e)
+            else:
+                message.available_at = self._retry_at(message.attempts, datetime.utcnow())
+                logger.warning('Outbox message %s (%s) failed, will retry: %s', message_id, topic, e)
+            db.session.commit()
+        return True
+
+    def drain(self, limit=None) -> int:
+        """Deliver due messages until none is left (or `limit` were handled)"""
+        handled = 0
+        while (limit is None or handled < limit) and self.dispatch_one():
+            handled += 1
+        return handled
+
+    def work(self, poll_interval=None):
+        """Dispatch until shut down, sleeping between passes until woken or the poll interval ends"""
+        while not self._stop.is_set():
+            try:
+                self.drain()
+            except Exception:
+                logger.exception('Outbox dispatch pass failed')
+                db.session.rollback()
+            finally:
+                db.session.remove()
+            self._wake.wait(poll_interval or self.poll_interval)
+            self._wake.clear()
+
+    def _run(self):
+        with self.app.app_context():
+            self.work()
+
+    def start(self):
+        """Start the dispatcher thread unless it is already running"""
+        if not self.worker or self.app is None:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='outbox', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        """Nudge the dispatcher thread, starting it if needed"""
+        if not self.worker or self.app is None:
+            return
+        self.start()
+        self._wake.set()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the dispatcher thread after its current pass"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stop.set()
+            self._wake.set()
+        if thread is not None and wait:
+            thread.join()
+
+
+outbox = Outbox()
+
+
+def _after_commit(session):
+    if session.info.pop('outbox_enqueued', False):
+        outbox.wake()
+
+
+def _after_rollback(session):
+    session.info.pop('outbox_enqueued', None)
@@ -0,0 +1,101 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Used until an application configures the hasher (scripts, shells)
+DEFAULT_METHOD = 'scrypt:32768:8:1'
+
+
+class HashingUnavailable(Exception):
+    """Too many password hashes are already queued or one took too long"""
+
+
+class PasswordHasher:
+    """Password hashing policy with CPU work offloaded to a bounded process pool.
+
+    Hashes are werkzeug's `method$salt$hash` strings, so every stored hash
+    records the scheme and cost it was made with and `needs_rehash` can spot
+    the ones made under an older policy. With `workers` at 0 hashing runs in
+    the calling thread.
+    """
+
+    def __init__(self, method: str = DEFAULT_METHOD, workers: int = 0, queue: int = 0, timeout: float = 10):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.configure(method, workers, queue, timeout)
+
+    def configure(self, method: str = None, workers: int = None, queue: int = None, timeout: float = None):
+        with self._lock:
+            if method is not None:
+                self.method = method
+                self._method_prefix = None
+            if workers is not None:
+                self.workers = workers
+            if queue is not None:
+                self.queue = queue
+            if timeout is not None:
+                self.timeout = timeout
+            self._slots = threading.BoundedSemaphore(self.workers + (self.queue or self.workers))
+            self._shutdown()
+
+    def _shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            # A pool inherited from a pre-fork parent has no live workers here
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        slots = self._slots
+        if not slots.acquire(timeout=self.timeout):
+            raise HashingUnavailable('Password hashing is saturated')
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        # The slot stays taken until the hash finishes, even if we stop waiting
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingUnavailable('Password hashing timed out')
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        if self._method_prefix is None:
+            # Werkzeug fills in default parameters ('scrypt' becomes
+            # 'scrypt:32768:8:1'); hash once to learn the full form
+            self._method_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def shutdown(self):
+        with self._lock:
+            self._shutdown()
+
+
+password_hasher = PasswordHasher()
+
+
+def configure_password_hasher(app):
+    password_hasher.configure(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS'],
+        queue=app.config['PASSWORD_HASH_QUEUE'],
+        timeout=app.config['PASSWORD_HASH_TIMEOUT']
+    )
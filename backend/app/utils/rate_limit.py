@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque, namedtuple
+
+try:
+    import redis
+except ImportError:  # Optional: only needed for a shared limiter backend
+    redis = None
+
+RateLimit = namedtuple('RateLimit', ['limit', 'window'])
+Decision = namedtuple('Decision', ['allowed', 'retry_after'])
+
+
+class MemoryBackend:
+    """Per-process sliding log of attempt timestamps per key.
+
+    Keeps at most `limit` timestamps per key and at most `max_keys` keys,
+    dropping the least recently used ones beyond that.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._logs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _retry_after(self, key, rule, now):
+        log = self._logs.get(key)
+        if log is None:
+            return 0
+        while log and log[0] <= now - rule.window:
+            log.popleft()
+        if len(log) < rule.limit:
+            return 0
+        return log[0] + rule.window - now
+
+    def hit(self, checks, now):
+        """Record an attempt against every (key, rule) unless one is over its limit"""
+        with self._lock:
+            retry_after = max(self._retry_after(key, rule, now) for key, rule in checks)
+            if retry_after > 0:
+                return retry_after
+            for key, rule in checks:
+                log = self._logs.get(key)
+                if log is None:
+                    log = self._logs[key] = deque()
+                log.append(now)
+                self._logs.move_to_end(key)
+            while len(self._logs) > self.max_keys:
+                self._logs.popitem(last=False)
+            return 0
+
+    def reset(self, key):
+        with self._lock:
+            self._logs.pop(key, None)
+
+
+class RedisBackend:
+    """Sliding log kept in Redis sorted sets, shared by every worker.
+
+    Takes any client with the redis-py interface, so a local stand-in such as
+    fakeredis works the same way in development.
+    """
+
+    def __init__(self, client, prefix: str = 'ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        if redis is None:
+            raise RuntimeError('RATE_LIMIT_STORAGE_URL needs the redis package installed')
+        return cls(redis.Redis.from_url(url))
+
+    def hit(self, checks, now):
+        pipe = self.client.pipeline()
+        for key, rule in checks:
+            pipe.zremrangebyscore(self.prefix + key, 0, now - rule.window)
+            pipe.zrange(self.prefix + key, 0, 0, withscores=True)
+            pipe.zcard(self.prefix + key)
+        results = pipe.execute()
+
+        retry_after = 0
+        for i, (key, rule) in enumerate(checks):
+            oldest, count = results[i * 3 + 1], results[i * 3 + 2]
+            if count >= rule.limit and oldest:
+                retry_after = max(retry_after, oldest[0][1] + rule.window - now)
+        if retry_after > 0:
+            return retry_after
+
+        pipe = self.client.pipeline()
+        member = f'{now}:{uuid.uuid4().hex}'
+        for key, rule in checks:
+            pipe.zadd(self.prefix + key, {member: now})
+            pipe.expire(self.prefix + key, math.ceil(rule.window))
+        pipe.execute()
+        return 0
+
+    def reset(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class RateLimiter:
+    """Sliding-window admission control for named actions.
+
+    Each action has rules per key kind, e.g. login attempts per email and per
+    client IP. An attempt is admitted only if every key is under its limit,
+    and only admitted attempts count.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self.rules = {}
+        self.enabled = True
+
+    def configure(self, backend=None, rules=None, enabled=None):
+        if backend is not None:
+            self.backend = backend
+        if rules is not None:
+            self.rules = rules
+        if enabled is not None:
+            self.enabled = enabled
+
+    def hit(self, action, **keys) -> Decision:
+        if not self.enabled:
+            return Decision(True, 0)
+        checks = [
+            (f'{action}:{kind}:{value}', self.rules[action][kind])
+            for kind, value in keys.items()
+            if value and kind in self.rules.get(action, {})
+        ]
+        if not checks:
+            return Decision(True, 0)
+        retry_after = self.backend.hit(checks, time.time())
+        return Decision(retry_after <= 0, max(1, math.ceil(retry_after)) if retry_after > 0 else 0)
+
+    def reset(self, action, kind, value):
+        self.backend.reset(f'{action}:{kind}:{value}')
+
+
+rate_limiter = RateLimiter()
+
+
+def configure_rate_limiter(app):
+    url = app.config['RATE_LIMIT_STORAGE_URL']
+    window = app.config['AUTH_RATE_LIMIT_WINDOW']
+    rate_limiter.configure(
+        backend=RedisBackend.from_url(url) if url else MemoryBackend(),
+        enabled=app.config['RATE_LIMIT_ENABLED'],
+        rules={
+            'login': {
+                'email': RateLimit(app.config['LOGIN_RATE_LIMIT_PER_EMAIL'], window),
+                'ip': RateLimit(app.config['LOGIN_RATE_LIMIT_PER_IP'], window),
+            },
+            'register': {
+                'ip': RateLimit(app.config['REGISTER_RATE_LIMIT_PER_IP'], window),
+            },
+        }
+    )
+
+
+def too_many_attempts(decision: Decision):
+    return (
+        {"message": "Too many attempts, please try again later"},
+        429,
+        {"Retry-After": str(decision.retry_after)}
+    )
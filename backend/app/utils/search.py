@@ -0,0 +1,204 @@
+import re
+from sqlalchemy import event, inspect, text, bindparam, table, column, func, literal_column, select
+from sqlalchemy.orm import Session
+from ..extensions import db
+from ..models.artwork import Artwork
+from ..models.user import User
+
+# Search document kept next to `artworks`: a GIN-indexed tsvector on
+# Postgres, an FTS5 virtual table on SQLite. Field weights are aligned so
+# both engines rank title > artist > category > description.
+artwork_search = table('artwork_search', column('artwork_id'), column('document'))
+
+INDEXED_FIELDS = ('title', 'description', 'category', 'artist_id')
+MAX_TERMS = 8
+
+_TERM_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+
+_POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS artwork_search (
+        artwork_id UUID PRIMARY KEY REFERENCES artworks (id) ON DELETE CASCADE,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_artwork_search_document ON artwork_search USING GIN (document)",
+]
+
+_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS artwork_search USING fts5(
+        artwork_id UNINDEXED, title, description, category, artist, prefix='2 3'
+    )
+    """,
+]
+
+_POSTGRES_INDEX = """
+    INSERT INTO artwork_search (artwork_id, document)
+    SELECT a.id,
+           setweight(to_tsvector('simple', coalesce(a.title, '')), 'A') ||
+           setweight(to_tsvector('simple', coalesce(u.username, '')), 'B') ||
+           setweight(to_tsvector('simple', coalesce(a.category, '')), 'C') ||
+           setweight(to_tsvector('simple', coalesce(a.description, '')), 'D')
+    FROM artworks a LEFT JOIN users u ON u.id = a.artist_id
+    WHERE {where}
+    ON CONFLICT (artwork_id) DO UPDATE SET document = EXCLUDED.document
+"""
+
+_SQLITE_INDEX = """
+    INSERT INTO artwork_search (artwork_id, title, description, category, artist)
+    SELECT a.id, coalesce(a.title, ''), coalesce(a.description, ''),
+           coalesce(a.category, ''), coalesce(u.username, '')
+    FROM artworks a LEFT JOIN users u ON u.id = a.artist_id
+    WHERE {where}
+"""
+
+
+class ArtworkSearch:
+    @staticmethod
+    def is_supported(dialect_name):
+        return dialect_name in ('postgresql', 'sqlite')
+
+    @staticmethod
+    def terms(search):
+        """Split free text into lowercase word terms (all must match)"""
+        return [term.lower() for term in _TERM_PATTERN.findall(search or '')][:MAX_TERMS]
+
+    @staticmethod
+    def match(search):
+        """Subquery of (artwork_id, rank) for artworks matching every term.
+
+        Terms are prefix-matched; a higher rank means a better match. Returns
+        None when the database has no search index, so callers can fall back
+        to ILIKE filtering.
+        """
+        dialect = db.session.get_bind().dialect.name
+        if not ArtworkSearch.is_supported(dialect):
+            return None
+
+        terms = ArtworkSearch.terms(search)
+        if not terms:
+            return None
+
+        if dialect == 'postgresql':
+            tsquery = func.to_tsquery('simple', ' & '.join(f'{term}:*' for term in terms))
+            return select(
+                artwork_search.c.artwork_id,
+                func.ts_rank_cd(artwork_search.c.document, tsquery).label('rank')
+            ).where(artwork_search.c.document.op('@@')(tsquery)).subquery('search_matches')
+
+        # bm25() is lower-is-better; weights follow the column order
+        # (artwork_id, title, description, category, artist)
+        fts_query = ' '.join(f'"{term}"*' for term in terms)
+        return select(
+            artwork_search.c.artwork_id,
+            (-literal_column('bm25(artwork_search, 0.0, 10.0, 1.0, 2.0, 5.0)')).label('rank')
+        ).where(literal_column('artwork_search').op('MATCH')(fts_query)).subquery('search_matches')
+
+    @staticmethod
+    def reindex(connection, artwork_ids=None, artist_ids=None):
+        """Rebuild search documents for the given artworks or artists' works.
+
+        With neither argument the whole index is rebuilt.
+        """
+        dialect = connection.dialect.name
+        if not ArtworkSearch.is_supported(dialect):
+            return
+
+        id_type = Artwork.__table__.c.id.type
+        if artwork_ids is not None:
+            where, ids = 'a.id IN :ids', list(artwork_ids)
+        elif artist_ids is not None:
+            where, ids = 'a.artist_id IN :ids', list(artist_ids)
+        else:
+            where, ids = '1 = 1', None
+
+        if ids is not None and not ids:
+            return
+
+        def statement(sql):
+            stmt = text(sql.format(where=where))
+            if ids is not None:
+                stmt = stmt.bindparams(bindparam('ids', value=ids, expanding=True, type_=id_type))
+            return stmt
+
+        if dialect == 'postgresql':
+            connection.execute(statement(_POSTGRES_INDEX))
+        else:
+            # FTS5 tables have no upsert: replace the affected rows
+            connection.execute(statement(
+                'DELETE FROM artwork_search WHERE artwork_id IN (SELECT a.id FROM artworks a WHERE {where})'
+            ))
+            connection.execute(statement(_SQLITE_INDEX))
+
+    @staticmethod
+    def remove(connection, artwork_ids):
+        if not artwork_ids or not ArtworkSearch.is_supported(connection.dialect.name):
+            return
+        stmt = text('DELETE FROM artwork_search WHERE artwork_id IN :ids').bindparams(
+            bindparam('ids', value=list(artwork_ids), expanding=True, type_=Artwork.__table__.c.id.type)
+        )
+        connection.execute(stmt)
+
+    @staticmethod
+    def create_index(connection):
+        """Create the search table (if missing) and backfill it"""
+        dialect = connection.dialect.name
+        if not ArtworkSearch.is_supported(dialect):
+            return
+
+        exists = inspect(connection).has_table('artwork_search')
+        for ddl in (_POSTGRES_DDL if dialect == 'postgresql' else _SQLITE_DDL):
+            connection.execute(text(ddl))
+        if not exists:
+            ArtworkSearch.reindex(connection)
+
+
+def _after_create(target, connection, **kw):
+    ArtworkSearch.create_index(connection)
+
+
+def _before_drop(target, connection, **kw):
+    # The Postgres table references artworks, so it has to go first
+    if ArtworkSearch.is_supported(connection.dialect.name):
+        connection.execute(text('DROP TABLE IF EXISTS artwork_search'))
+
+
+def _after_flush(session, flush_context):
+    """Keep search documents in step with artwork and artist writes"""
+    artwork_ids, artist_ids, removed_ids = set(), set(), set()
+
+    for obj in session.new:
+        if isinstance(obj, Artwork):
+            artwork_ids.add(obj.id)
+
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Artwork):
+            if any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+                artwork_ids.add(obj.id)
+        elif isinstance(obj, User):
+            if state.attrs.username.history.has_changes():
+                artist_ids.add(obj.id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Artwork):
+            removed_ids.add(obj.id)
+
+    if not (artwork_ids or artist_ids or removed_ids):
+        return
+
+    connection = session.connection()
+    ArtworkSearch.remove(connection, removed_ids)
+    ArtworkSearch.reindex(connection, artwork_ids=artwork_ids)
+    ArtworkSearch.reindex(connection, artist_ids=artist_ids)
+
+
+def register_search_index():
+    """Hook index creation into create_all(), removal into drop_all() and maintenance into flushes"""
+    if not event.contains(db.metadata, 'after_create', _after_create):
+        event.listen(db.metadata, 'after_create', _after_create)
+    if not event.contains(db.metadata, 'before_drop', _before_drop):
+        event.listen(db.metadata, 'before_drop', _before_drop)
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1,163 @@
+# Hand-specialized serializers for the hot payloads. Each function emits
+# exactly what the matching marshmallow schema dumps (ArtworkSchema,
+# OrderSchema, CartSchema) without per-field dispatch; the schemas remain
+# the reference definition and bench_serializers.py checks parity.
+
+from .artwork_loader import artwork_loader
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def _uuid(value):
+    return str(value) if value is not None else None
+
+
+def _timestamp(value):
+    return value.strftime(TIMESTAMP_FORMAT) if value is not None else None
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _money(value):
+    return float(value) if value is not None else None
+
+
+def _artwork_fields(artwork):
+    return {
+        'created_at': _timestamp(artwork.created_at),
+        'updated_at': _timestamp(artwork.updated_at),
+        'price': _money(artwork.price),
+        'id': _uuid(artwork.id),
+        'title': artwork.title,
+        'description': artwork.description,
+        'category': artwork.category,
+        'image_url': artwork.image_url,
+        'image_public_id': artwork.image_public_id,
+        'artist_id': _uuid(artwork.artist_id),
+        'is_available': artwork.is_available,
+    }
+
+
+def serialize_artwork(artwork, artist_name):
+    """ArtworkSchema output with `artist` set to the given display name"""
+    data = _artwork_fields(artwork)
+    data['artist'] = artist_name
+    return data
+
+
+def serialize_order_item(item):
+    artwork = artwork_loader().get(item.artwork_id)
+    return {
+        'price': _money(item.price),
+        'artwork': _artwork_fields(artwork) if artwork is not None else None,
+        'id': _uuid(item.id),
+        'order_id': _uuid(item.order_id),
+        'artwork_id': _uuid(item.artwork_id),
+        'quantity': item.quantity,
+    }
+
+
+def serialize_payment(payment):
+    return {
+        'created_at': _timestamp(payment.created_at),
+        'updated_at': _timestamp(payment.updated_at),
+        'amount': _money(payment.amount),
+        'id': _uuid(payment.id),
+        'order_id': _uuid(payment.order_id),
+        'provider': payment.provider,
+        'status': payment.status,
+        'transaction_id': payment.transaction_id,
+    }
+
+
+def serialize_delivery(delivery):
+    return {
+        'created_at': _timestamp(delivery.created_at),
+        'updated_at': _timestamp(delivery.updated_at),
+        'id': _uuid(delivery.id),
+        'order_id': _uuid(delivery.order_id),
+        'status': delivery.status,
+        'tracking_number': delivery.tracking_number,
+        'carrier': delivery.carrier,
+        'estimated_delivery': _isoformat(delivery.estimated_delivery),
+    }
+
+
+def serialize_order(order):
+    """OrderSchema output"""
+    artwork_loader().prime(item.artwork_id for item in order.items)
+    return {
+        'items': [serialize_order_item(item) for item in order.items],
+        'payments': [serialize_payment(payment) for payment in order.payments],
+        'deliveries': [serialize_delivery(delivery) for delivery in order.deliveries],
+        'created_at': _timestamp(order.created_at),
+        'updated_at': _timestamp(order.updated_at),
+        'total_amount': _money(order.total_amount),
+        'id': _uuid(order.id),
+        'customer_id': _uuid(order.customer_id),
+        'status': order.status,
+        'shipping_address': order.shipping_address,
+        'shipping_city': order.shipping_city,
+        'shipping_country': order.shipping_country,
+        'shipping_postal_code': order.shipping_postal_code,
+    }
+
+
+def serialize_orders(orders):
+    """OrderSchema(many=True) output, with one artwork query for the whole list"""
+    artwork_loader().prime(item.artwork_id for order in orders for item in order.items)
+    return [serialize_order(order) for order in orders]
+
+
+def serialize_cart_item(item):
+    artwork = artwork_loader().get(item.artwork_id)
+    if artwork:
+        artwork_data = {
+            'id': str(artwork.id),
+            'title': artwork.title,
+            'price': float(artwork.price) if artwork.price else 0,
+            'image_url': artwork.image_url,
+            'category': artwork.category,
+            'artist': artwork.artist_name if artwork.artist_name is not None else 'Unknown Artist'
+        }
+    else:
+        artwork_data = None
+    return {
+        'artwork': artwork_data,
+        'id': _uuid(item.id),
+        'cart_id': _uuid(item.cart_id),
+        'artwork_id': _uuid(item.artwork_id),
+        'quantity': item.quantity,
+        'added_at': _isoformat(item.added_at),
+        'version': item.version,
+    }
+
+
+def serialize_cart(cart):
+    """CartSchema output"""
+    artwork_loader().prime(item.artwork_id for item in cart.items)
+    return {
+        'items': [serialize_cart_item(item) for item in cart.items],
+        'item_count': cart.item_count,
+        'subtotal': _money(cart.subtotal),
+        'version': cart.version,
+        'created_at': _timestamp(cart.created_at),
+        'updated_at': _timestamp(cart.updated_at),
+        'id': _uuid(cart.id),
+        'user_id': _uuid(cart.user_id),
+    }
+
+
+def serialize_cart_changes(cart, since_version, items, removed):
+    """Lines changed and artworks removed since `since_version`, plus the cart totals"""
+    artwork_loader().prime(item.artwork_id for item in items)
+    return {
+        'since_version': since_version,
+        'version': cart.version,
+        'item_count': cart.item_count,
+        'subtotal': _money(cart.subtotal),
+        'items': [serialize_cart_item(item) for item in items],
+        'removed': [_uuid(artwork_id) for artwork_id in removed],
+    }
@@ -0,0 +1,30 @@
+import json
+import zlib
+
+# Flush encoded output once this many bytes are buffered, so a stream of
+# small records goes out in reasonably sized chunks
+CHUNK_SIZE = 64 * 1024
+
+
+def ndjson_chunks(records, chunk_size: int = CHUNK_SIZE):
+    """Encode records as newline-delimited JSON, batched into byte chunks"""
+    buffer, size = [], 0
+    for record in records:
+        line = json.dumps(record, separators=(',', ':')).encode() + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks):
+    """Compress a byte stream incrementally into a single gzip member"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
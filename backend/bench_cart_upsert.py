@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Concurrent add-to-cart stress test: collectors racing to add the same artworks
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, func, select
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.artwork import Artwork
+from app.models.cart import Cart, CartItem
+from app.models.user import User
+from app.utils.cart_service import CartService
+from app.utils.helpers import get_or_create_for_user
+
+ARTWORKS = 10
+COLLECTORS = 4
+ADDS = 600
+CONCURRENCY = [1, 4, 16]
+
+
+def make_config(database):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{database}")
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {}
+        PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+        BACKGROUND_WORKERS = 0
+        OUTBOX_WORKER = False
+    return BenchConfig()
+
+
+def build_catalog():
+    db.drop_all()
+    db.create_all()
+    artist = User(username='artist', email='artist@example.com', full_name='Artist', role='artist')
+    artist.set_password('BenchPassw0rd')
+    collectors = [
+        User(username=f'collector{i}', email=f'collector{i}@example.com', full_name=f'Collector {i}',
+             role='collector')
+        for i in range(COLLECTORS)
+    ]
+    for collector in collectors:
+        collector.set_password('BenchPassw0rd')
+    db.session.add_all([artist] + collectors)
+    db.session.flush()
+    artworks = [
+        Artwork(title=f'Piece {i}', price=Decimal(100 + i), category='painting', artist_id=artist.id)
+        for i in range(ARTWORKS)
+    ]
+    db.session.add_all(artworks)
+    db.session.commit()
+    return [collector.id for collector in collectors], [artwork.id for artwork in artworks]
+
+
+def add_with_upsert(user_id, artwork_id):
+    """The shipped path: claim the cart version, one upsert, one summary refresh"""
+    CartService.add_item(user_id, artwork_id)
+
+
+def add_read_then_write(user_id, artwork_id):
+    """The path the upsert replaced: look up artwork, cart and line, then write.
+
+    It keeps no cart version or stored summary, so its statement count is a
+    lower bound for what the same bookkeeping would cost this way.
+    """
+    if not Artwork.query.filter_by(id=artwork_id, is_available=True).first():
+        return
+    cart = get_or_create_for_user(Cart, user_id)
+    line = CartItem.query.filter_by(cart_id=cart.id, artwork_id=artwork_id).first()
+    if not line:
+        db.session.add(CartItem(cart_id=cart.id, artwork_id=artwork_id, quantity=1))
+    db.session.flush()
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def attempt(app, strategy, user_id, artwork_id):
+    with app.app_context():
+        try:
+            strategy(user_id, artwork_id)
+            db.session.commit()
+            return 'added'
+        except Exception:
+            db.session.rollback()
+            return 'error'
+        finally:
+            db.session.remove()
+
+
+def run(app, strategy, collectors, artwork_ids, concurrency):
+    rng = random.Random(concurrency)
+    attempts = [(rng.choice(collectors), rng.choice(artwork_ids)) for _ in range(ADDS)]
+
+    counter = StatementCounter()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', counter)
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(lambda args: attempt(app, strategy, *args), attempts))
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(engine, 'before_cursor_execute', counter)
+
+    with app.app_context():
+        duplicates = db.session.execute(
+            select(func.count()).select_from(
+                select(CartItem.cart_id).group_by(CartItem.cart_id, CartItem.artwork_id).
+                having(func.count() > 1).subquery()
+            )
+        ).scalar()
+        stacked = db.session.execute(select(func.count()).where(CartItem.quantity != 1)).scalar()
+        lines = db.session.execute(select(func.count()).select_from(CartItem)).scalar()
+    expected = len(set(attempts))
+    return outcomes, elapsed, counter.count / ADDS, duplicates, stacked, expected - lines
+
+
+def main():
+    database = os.path.join(tempfile.mkdtemp(), 'cart.db')
+    app = create_app(make_config(database))
+    with app.app_context():
+        engine_name = db.engine.dialect.name
+
+    print(f"{ADDS} adds of {ARTWORKS} artworks across {COLLECTORS} carts on {engine_name}")
+    print("=" * 72)
+    failed = False
+    for name, strategy in (('upsert', add_with_upsert), ('read-then-write', add_read_then_write)):
+        for concurrency in CONCURRENCY:
+            with app.app_context():
+                collectors, artwork_ids = build_catalog()
+            outcomes, elapsed, statements, duplicates, stacked, missing = run(
+                app, strategy, collectors, artwork_ids, concurrency
+            )
+            added = outcomes.count('added')
+            print(f"{name:16s} {concurrency:3d} threads  {ADDS / elapsed:7.1f} adds/s  "
+                  f"{statements:4.1f} statements/add  errors {outcomes.count('error'):3d}  "
+                  f"missing lines {missing:3d}  duplicate lines {duplicates}  quantity > 1 {stacked}")
+            if strategy is add_with_upsert and (duplicates or stacked or missing or added != ADDS):
+                failed = True
+    if failed:
+        print("✗ upsert lost adds, duplicated lines or stacked quantities")
+        sys.exit(1)
+    print("✓ every artwork added landed on a single line of quantity 1")
+
+
+if __name__ == '__main__':
+    main()
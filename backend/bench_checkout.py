@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Concurrent checkout stress test: many collectors racing for the same artworks
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, select
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.artwork import Artwork
+from app.models.order import Order, OrderItem
+from app.models.user import User
+from app.utils.order_service import OrderService
+
+ARTWORKS = 200
+COLLECTORS = 16
+CHECKOUTS = 800
+LINES_PER_ORDER = 3
+CONCURRENCY = [1, 4, 16]
+SHIPPING = {'fullName': 'Bench', 'address': '1 Bench St', 'city': 'Bench', 'country': 'BE', 'postalCode': '1000'}
+
+
+def make_config(database):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = os.getenv('BENCH_DATABASE_URL', f"sqlite:///{database}")
+        SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {}
+        PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+        BACKGROUND_WORKERS = 0
+        OUTBOX_WORKER = False
+    return BenchConfig()
+
+
+def build_catalog():
+    db.drop_all()
+    db.create_all()
+    artist = User(username='artist', email='artist@example.com', full_name='Artist', role='artist')
+    artist.set_password('BenchPassw0rd')
+    collectors = [
+        User(username=f'collector{i}', email=f'collector{i}@example.com', full_name=f'Collector {i}',
+             role='collector')
+        for i in range(COLLECTORS)
+    ]
+    for collector in collectors:
+        collector.set_password('BenchPassw0rd')
+    db.session.add_all([artist] + collectors)
+    db.session.flush()
+    artworks = [
+        Artwork(title=f'Piece {i}', price=Decimal(100 + i), category='painting', artist_id=artist.id)
+        for i in range(ARTWORKS)
+    ]
+    db.session.add_all(artworks)
+    db.session.commit()
+    return [collector.id for collector in collectors], [artwork.id for artwork in artworks]
+
+
+def checkout(app, customer_id, artwork_ids):
+    with app.app_context():
+        try:
+            artworks, unavailable = OrderService.reserve_artworks(artwork_ids)
+            if unavailable:
+                db.session.rollback()
+                return 'sold out'
+            OrderService.create_order(customer_id, artwork_ids, artworks, SHIPPING)
+            db.session.commit()
+            return 'placed'
+        except Exception:
+            db.session.rollback()
+            return 'error'
+        finally:
+            db.session.remove()
+
+
+def run(app, collectors, artwork_ids, concurrency):
+    rng = random.Random(concurrency)
+    attempts = [
+        (rng.choice(collectors), rng.sample(artwork_ids, LINES_PER_ORDER))
+        for _ in range(CHECKOUTS)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda attempt: checkout(app, *attempt), attempts))
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        sold_lines = db.session.execute(
+            select(OrderItem.artwork_id, func.count()).group_by(OrderItem.artwork_id)
+        ).all()
+        oversold = sum(1 for _, count in sold_lines if count > 1)
+        unavailable = db.session.execute(
+            select(func.count()).select_from(Artwork).where(Artwork.is_available == False)
+        ).scalar()
+        orders = db.session.execute(select(func.count()).select_from(Order)).scalar()
+    return outcomes, elapsed, oversold, len(sold_lines), unavailable, orders
+
+
+def main():
+    database = os.path.join(tempfile.mkdtemp(), 'checkout.db')
+    app = create_app(make_config(database))
+    with app.app_context():
+        engine_name = db.engine.dialect.name
+
+    print(f"{CHECKOUTS} checkouts of {LINES_PER_ORDER} random pieces from {ARTWORKS} unique artworks on {engine_name}")
+    print("=" * 72)
+    failed = False
+    for concurrency in CONCURRENCY:
+        with app.app_context():
+            collectors, artwork_ids = build_catalog()
+        outcomes, elapsed, oversold, sold, unavailable, orders = run(app, collectors, artwork_ids, concurrency)
+        placed = outcomes.count('placed')
+        print(f"{concurrency:3d} threads  {CHECKOUTS / elapsed:7.1f} checkouts/s  "
+              f"placed {placed:4d}  sold out {outcomes.count('sold out'):4d}  "
+              f"errors {outcomes.count('error'):3d}  oversold {oversold}")
+        if oversold or placed != orders or sold != placed * LINES_PER_ORDER or unavailable != sold:
+            failed = True
+    if failed:
+        print("✗ oversold or inconsistent sales detected")
+        sys.exit(1)
+    print("✓ no artwork sold twice")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Login throughput under different password hashing policies and pool sizes
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.user import User
+from app.utils.passwords import password_hasher
+
+USERS = 8
+CONCURRENCY = 8
+LOGINS = 48
+PASSWORD = 'BenchPassw0rd'
+
+METHODS = [
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:100000',
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1',
+]
+WORKER_COUNTS = [0, 2, 4]
+
+
+def make_config(database, method, workers):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        PASSWORD_HASH_METHOD = method
+        PASSWORD_HASH_WORKERS = workers
+        PASSWORD_HASH_QUEUE = CONCURRENCY
+        PASSWORD_HASH_TIMEOUT = 60
+        RATE_LIMIT_ENABLED = False
+    return BenchConfig()
+
+
+def build_users():
+    db.drop_all()
+    db.create_all()
+    for i in range(USERS):
+        user = User(username=f'bench{i}', email=f'bench{i}@example.com', full_name=f'Bench {i}',
+                    role='collector')
+        user.set_password(PASSWORD)
+        db.session.add(user)
+    db.session.commit()
+
+
+def run_logins(app):
+    client = app.test_client()
+
+    def login(i):
+        response = client.post('/api/auth/login', json={
+            'email': f'bench{i % USERS}@example.com',
+            'password': PASSWORD
+        })
+        return response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        statuses = list(pool.map(login, range(LOGINS)))
+    elapsed = time.perf_counter() - started
+    if any(status != 200 for status in statuses):
+        print(f"✗ unexpected login statuses: {sorted(set(statuses))}")
+        sys.exit(1)
+    return elapsed
+
+
+def main():
+    database = os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    print(f"{LOGINS} logins, {CONCURRENCY} concurrent clients")
+    print("=" * 64)
+    for method in METHODS:
+        for workers in WORKER_COUNTS:
+            app = create_app(make_config(database, method, workers))
+            with app.app_context():
+                build_users()
+            elapsed = run_logins(app)
+            print(f"{method:22s} workers {workers}  {LOGINS / elapsed:7.1f} logins/s  "
+                  f"{elapsed / LOGINS * 1000:7.1f} ms/login")
+        password_hasher.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: marshmallow schemas vs app.utils.serializers
+
+Output parity between the two is asserted by tests/test_serializers.py.
+"""
+
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.user import User
+from app.models.artwork import Artwork, ArtworkSchema
+from app.models.order import Order, OrderItem, OrderSchema
+from app.models.cart import Cart, CartItem, CartSchema
+from app.models.payment import Payment
+from app.models.delivery import Delivery
+from app.utils.serializers import serialize_artwork, serialize_order, serialize_cart
+
+PAGE_SIZE = 50
+ROUNDS = 200
+
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
+
+def build_fixtures():
+    artist = User(username='bench_artist', email='bench@example.com', full_name='Bench Artist', role='artist',
+                  password_hash='x')
+    collector = User(username='bench_collector', email='collector@example.com', full_name='Bench Collector',
+                     role='collector', password_hash='x')
+    db.session.add_all([artist, collector])
+    db.session.flush()
+
+    artworks = []
+    for i in range(PAGE_SIZE):
+        artworks.append(Artwork(
+            title=f'Artwork {i}',
+            description='Oil on canvas' if i % 2 else None,
+            price=Decimal('100.50') + i,
+            category='painting',
+            image_url=f'https://example.com/{i}.jpg',
+            artist_id=artist.id,
+            created_at=datetime(2025, 1, 1) + timedelta(hours=i)
+        ))
+    db.session.add_all(artworks)
+    db.session.flush()
+
+    orders = []
+    for i in range(PAGE_SIZE):
+        order = Order(
+            customer_id=collector.id,
+            total_amount=Decimal('250.00'),
+            shipping_address='1 Gallery Road',
+            shipping_city='Nairobi',
+            shipping_country='Kenya',
+            shipping_postal_code='00100',
+            items=[OrderItem(artwork_id=artworks[(i + j) % PAGE_SIZE].id, quantity=1, price=Decimal('125.00'))
+                   for j in range(2)]
+        )
+        order.payments.append(Payment(amount=Decimal('250.00'), status='completed', transaction_id=f'pi_{i}'))
+        order.deliveries.append(Delivery(status='pending', estimated_delivery=datetime(2025, 2, 1)))
+        orders.append(order)
+    db.session.add_all(orders)
+
+    cart = Cart(user_id=collector.id, items=[CartItem(artwork_id=a.id, quantity=1) for a in artworks])
+    db.session.add(cart)
+    db.session.commit()
+
+    # Load every relationship up front so both sides time serialization only
+    for artwork in artworks:
+        artwork.artist
+    for order in orders:
+        for item in order.items:
+            item.artwork
+        order.payments, order.deliveries
+    for item in cart.items:
+        item.artwork.artist
+    return artworks, orders, cart
+
+
+def schema_artworks(artworks):
+    data = ArtworkSchema(many=True).dump(artworks)
+    for artwork, item in zip(artworks, data):
+        item['artist'] = artwork.artist.username
+    return data
+
+
+def main():
+    app = create_app(BenchConfig())
+    with app.app_context():
+        db.create_all()
+        artworks, orders, cart = build_fixtures()
+
+        cases = [
+            ('artworks', lambda: schema_artworks(artworks),
+             lambda: [serialize_artwork(a, a.artist.username) for a in artworks]),
+            ('orders', lambda: OrderSchema(many=True).dump(orders),
+             lambda: [serialize_order(o) for o in orders]),
+            ('cart', lambda: CartSchema().dump(cart),
+             lambda: serialize_cart(cart)),
+        ]
+
+        print(f"Serializing {PAGE_SIZE}-item payloads, {ROUNDS} rounds")
+        print("=" * 50)
+        for name, reference, fast in cases:
+            schema_time = timeit.timeit(reference, number=ROUNDS) / ROUNDS * 1000
+            fast_time = timeit.timeit(fast, number=ROUNDS) / ROUNDS * 1000
+            print(f"{name:10s} schema {schema_time:7.3f} ms  fast {fast_time:7.3f} ms  "
+                  f"x{schema_time / fast_time:.1f}")
+
+
+if __name__ == '__main__':
+    main()
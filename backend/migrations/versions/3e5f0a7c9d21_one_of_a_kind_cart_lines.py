@@ -0,0 +1,45 @@
+"""Collapse cart lines to a quantity of 1
+
+Revision ID: 3e5f0a7c9d21
+Revises: b6d93e1f7a42
+Create Date: 2026-10-18 10:04:17.226830
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3e5f0a7c9d21'
+down_revision = 'b6d93e1f7a42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Artworks are one of a kind; repeated adds used to stack quantities
+    # that checkout then refused
+    op.execute("""
+        UPDATE carts SET version = version + 1
+        WHERE id IN (SELECT cart_id FROM cart_items WHERE quantity > 1)
+    """)
+    op.execute("""
+        UPDATE cart_items SET
+            quantity = 1,
+            version = (SELECT c.version FROM carts c WHERE c.id = cart_items.cart_id)
+        WHERE quantity > 1
+    """)
+    op.execute("""
+        UPDATE carts SET
+            item_count = (
+                SELECT coalesce(sum(ci.quantity), 0) FROM cart_items ci WHERE ci.cart_id = carts.id
+            ),
+            subtotal = (
+                SELECT coalesce(sum(ci.quantity * a.price), 0)
+                FROM cart_items ci JOIN artworks a ON a.id = ci.artwork_id
+                WHERE ci.cart_id = carts.id
+            )
+    """)
+
+
+def downgrade():
+    pass
@@ -0,0 +1,30 @@
+"""Catalog version stamp
+
+Revision ID: 65d0f8cb86c5
+Revises: f5eb63daf6dd
+Create Date: 2026-10-18 03:05:47.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '65d0f8cb86c5'
+down_revision = 'f5eb63daf6dd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('catalog_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO catalog_state (id, version, updated_at) VALUES (1, 1, CURRENT_TIMESTAMP)")
+
+
+def downgrade():
+    op.drop_table('catalog_state')
@@ -0,0 +1,41 @@
+"""Make artworks.category, order_items.quantity and orders.status NOT NULL as in the models
+
+Revision ID: 7c2d4e9a1b53
+Revises: 3e5f0a7c9d21
+Create Date: 2026-10-18 11:20:36.804152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2d4e9a1b53'
+down_revision = '3e5f0a7c9d21'
+branch_labels = None
+depends_on = None
+
+
+# table, column, type, value for rows written while the column allowed NULL
+COLUMNS = [
+    ('artworks', 'category', sa.String(length=50), 'mixed-media'),
+    ('order_items', 'quantity', sa.Integer(), 1),
+    ('orders', 'status', sa.String(length=50), 'pending'),
+]
+
+
+def upgrade():
+    for table, column, type_, fill in COLUMNS:
+        op.execute(
+            sa.table(table, sa.column(column, type_)).update().
+            where(sa.column(column).is_(None)).
+            values({column: fill})
+        )
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=type_, nullable=False)
+
+
+def downgrade():
+    for table, column, type_, _ in reversed(COLUMNS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, existing_type=type_, nullable=True)
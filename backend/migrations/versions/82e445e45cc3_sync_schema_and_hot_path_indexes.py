@@ -0,0 +1,179 @@
+"""Sync schema with models and index hot filter/join paths
+
+Revision ID: 82e445e45cc3
+Revises: 65d0f8cb86c5
+Create Date: 2026-10-18 03:31:09.552170
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '82e445e45cc3'
+down_revision = '65d0f8cb86c5'
+branch_labels = None
+depends_on = None
+
+
+# Columns the models gained after the initial migration was generated.
+# NOT NULL columns get a server default so existing rows can be filled.
+MISSING_COLUMNS = {
+    'users': [
+        sa.Column('full_name', sa.String(length=100), nullable=False, server_default=''),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('country', sa.String(length=100), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ],
+    'artworks': [
+        sa.Column('image_public_id', sa.String(length=255), nullable=True),
+        sa.Column('is_available', sa.Boolean(), nullable=True, server_default=sa.true()),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ],
+    'carts': [
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ],
+    'notifications': [
+        sa.Column('type', sa.String(length=50), nullable=True),
+    ],
+    'orders': [
+        sa.Column('shipping_address', sa.Text(), nullable=False, server_default=''),
+        sa.Column('shipping_city', sa.String(length=100), nullable=False, server_default=''),
+        sa.Column('shipping_country', sa.String(length=100), nullable=False, server_default=''),
+        sa.Column('shipping_postal_code', sa.String(length=20), nullable=False, server_default=''),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ],
+    'deliveries': [
+        sa.Column('carrier', sa.String(length=80), nullable=True),
+        sa.Column('estimated_delivery', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ],
+    'payments': [
+        sa.Column('transaction_id', sa.String(length=255), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ],
+}
+
+# (name, table, columns)
+INDEXES = [
+    ('ix_artworks_available_created', 'artworks', ['is_available', 'created_at']),
+    ('ix_artworks_available_price', 'artworks', ['is_available', 'price']),
+    ('ix_artworks_artist_id', 'artworks', ['artist_id']),
+    ('ix_notifications_user_created', 'notifications', ['user_id', 'created_at']),
+    ('ix_orders_customer_created', 'orders', ['customer_id', 'created_at']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_artwork_id', 'order_items', ['artwork_id']),
+    ('ix_payments_order_id', 'payments', ['order_id']),
+    ('ix_deliveries_order_id', 'deliveries', ['order_id']),
+]
+
+# Pairs the cart and wishlist routes already treat as unique
+UNIQUE_CONSTRAINTS = [
+    ('uq_cart_items_cart_artwork', 'cart_items', ['cart_id', 'artwork_id']),
+    ('uq_wishlist_items_wishlist_artwork', 'wishlist_items', ['wishlist_id', 'artwork_id']),
+]
+
+
+def _create_missing_tables(inspector):
+    tables = inspector.get_table_names()
+    if 'wishlists' not in tables:
+        op.create_table('wishlists',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+    if 'wishlist_items' not in tables:
+        op.create_table('wishlist_items',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('wishlist_id', sa.UUID(), nullable=False),
+        sa.Column('artwork_id', sa.UUID(), nullable=False),
+        sa.Column('added_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['artwork_id'], ['artworks.id'], ),
+        sa.ForeignKeyConstraint(['wishlist_id'], ['wishlists.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+
+def _add_missing_columns(inspector):
+    for table, columns in MISSING_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+
+def _merge_duplicate_items():
+    # Fold duplicate cart lines into one (summing quantities) and drop
+    # duplicate wishlist entries so the unique constraints can be built
+    op.execute("""
+        UPDATE cart_items SET quantity = (
+            SELECT sum(coalesce(d.quantity, 1)) FROM cart_items d
+            WHERE d.cart_id = cart_items.cart_id AND d.artwork_id = cart_items.artwork_id
+        )
+        WHERE EXISTS (
+            SELECT 1 FROM cart_items d
+            WHERE d.cart_id = cart_items.cart_id AND d.artwork_id = cart_items.artwork_id
+              AND d.id <> cart_items.id
+        )
+    """)
+    for table, owner in (('cart_items', 'cart_id'), ('wishlist_items', 'wishlist_id')):
+        op.execute(f"""
+            DELETE FROM {table} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY {owner}, artwork_id ORDER BY added_at, id
+                    ) AS position
+                    FROM {table}
+                ) ranked
+                WHERE position > 1
+            )
+        """)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    _create_missing_tables(inspector)
+    _add_missing_columns(inspector)
+    _merge_duplicate_items()
+
+    if bind.dialect.name != 'postgresql':
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+        for name, table, columns in UNIQUE_CONSTRAINTS:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.create_unique_constraint(name, columns)
+        return
+
+    # Build indexes without blocking writes. CONCURRENTLY cannot run inside
+    # a transaction, so commit the schema changes above first.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, columns in UNIQUE_CONSTRAINTS:
+            op.create_index(name, table, columns, unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+    # Promote the unique indexes to constraints (metadata-only, no rescan)
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}')
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        if bind.dialect.name == 'postgresql':
+            op.drop_constraint(name, table, type_='unique')
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.drop_constraint(name, type_='unique')
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+
+    # Columns and tables added to match the models are left in place: the
+    # application cannot run without them.
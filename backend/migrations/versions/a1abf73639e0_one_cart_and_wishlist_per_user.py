@@ -0,0 +1,85 @@
+"""One cart and one wishlist per user
+
+Revision ID: a1abf73639e0
+Revises: cf3c54502d8e
+Create Date: 2026-10-18 04:41:52.207318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1abf73639e0'
+down_revision = 'cf3c54502d8e'
+branch_labels = None
+depends_on = None
+
+
+# (constraint, container table, item table, item foreign key, items have a quantity)
+CONTAINERS = [
+    ('uq_carts_user_id', 'carts', 'cart_items', 'cart_id', True),
+    ('uq_wishlists_user_id', 'wishlists', 'wishlist_items', 'wishlist_id', False),
+]
+
+
+def _merge_duplicates(bind, table, item_table, owner, has_quantity):
+    # Concurrent first views used to create several containers per user.
+    # Keep the oldest and fold the others' items into it.
+    users = bind.execute(sa.text(
+        f"SELECT user_id FROM {table} GROUP BY user_id HAVING count(*) > 1"
+    )).scalars().all()
+    for user_id in users:
+        keeper, *others = bind.execute(sa.text(
+            f"SELECT id FROM {table} WHERE user_id = :user_id ORDER BY created_at, id"
+        ), {'user_id': user_id}).scalars().all()
+        for other in others:
+            items = bind.execute(sa.text(
+                f"SELECT id, artwork_id{', quantity' if has_quantity else ''} FROM {item_table} WHERE {owner} = :owner"
+            ), {'owner': other}).all()
+            for item in items:
+                existing = bind.execute(sa.text(
+                    f"SELECT id FROM {item_table} WHERE {owner} = :owner AND artwork_id = :artwork_id"
+                ), {'owner': keeper, 'artwork_id': item.artwork_id}).scalar()
+                if existing is None:
+                    bind.execute(sa.text(
+                        f"UPDATE {item_table} SET {owner} = :owner WHERE id = :id"
+                    ), {'owner': keeper, 'id': item.id})
+                    continue
+                if has_quantity:
+                    bind.execute(sa.text(
+                        f"UPDATE {item_table} SET quantity = coalesce(quantity, 1) + :quantity WHERE id = :id"
+                    ), {'quantity': item.quantity or 1, 'id': existing})
+                bind.execute(sa.text(f"DELETE FROM {item_table} WHERE id = :id"), {'id': item.id})
+            bind.execute(sa.text(f"DELETE FROM {table} WHERE id = :id"), {'id': other})
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    for name, table, item_table, owner, has_quantity in CONTAINERS:
+        _merge_duplicates(bind, table, item_table, owner, has_quantity)
+
+    if bind.dialect.name != 'postgresql':
+        for name, table, *_ in CONTAINERS:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.create_unique_constraint(name, ['user_id'])
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, *_ in CONTAINERS:
+            op.create_index(name, table, ['user_id'], unique=True, postgresql_concurrently=True, if_not_exists=True)
+
+    for name, table, *_ in CONTAINERS:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}')
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    for name, table, *_ in CONTAINERS:
+        if bind.dialect.name == 'postgresql':
+            op.drop_constraint(name, table, type_='unique')
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.drop_constraint(name, type_='unique')
@@ -0,0 +1,43 @@
+"""Index artworks by (updated_at, id) for exports that include unavailable rows
+
+Revision ID: b6d93e1f7a42
+Revises: f2b8d61c3a05
+Create Date: 2026-10-18 09:12:44.518203
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d93e1f7a42'
+down_revision = 'f2b8d61c3a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Incremental exports now also return sold and withdrawn artworks, so
+    # the index leads with the change time instead of availability
+    if op.get_bind().dialect.name != 'postgresql':
+        op.create_index('ix_artworks_updated_id', 'artworks', ['updated_at', 'id'])
+        op.drop_index('ix_artworks_available_updated', table_name='artworks')
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_artworks_updated_id', 'artworks', ['updated_at', 'id'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_artworks_available_updated', table_name='artworks',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        op.create_index('ix_artworks_available_updated', 'artworks', ['is_available', 'updated_at'])
+        op.drop_index('ix_artworks_updated_id', table_name='artworks')
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_artworks_available_updated', 'artworks', ['is_available', 'updated_at'],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.drop_index('ix_artworks_updated_id', table_name='artworks',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,29 @@
+"""Index artworks by change time for incremental catalog exports
+
+Revision ID: cf3c54502d8e
+Revises: 82e445e45cc3
+Create Date: 2026-10-18 04:02:16.318410
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'cf3c54502d8e'
+down_revision = '82e445e45cc3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        op.create_index('ix_artworks_available_updated', 'artworks', ['is_available', 'updated_at'])
+        return
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_artworks_available_updated', 'artworks', ['is_available', 'updated_at'],
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_artworks_available_updated', table_name='artworks')
@@ -0,0 +1,40 @@
+"""Store cart item count and subtotal
+
+Revision ID: d4c1e8f09b27
+Revises: a1abf73639e0
+Create Date: 2026-10-18 05:12:40.581907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4c1e8f09b27'
+down_revision = 'a1abf73639e0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('carts') as batch_op:
+        batch_op.add_column(sa.Column('item_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('subtotal', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE carts SET
+            item_count = (
+                SELECT coalesce(sum(ci.quantity), 0) FROM cart_items ci WHERE ci.cart_id = carts.id
+            ),
+            subtotal = (
+                SELECT coalesce(sum(ci.quantity * a.price), 0)
+                FROM cart_items ci JOIN artworks a ON a.id = ci.artwork_id
+                WHERE ci.cart_id = carts.id
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('carts') as batch_op:
+        batch_op.drop_column('subtotal')
+        batch_op.drop_column('item_count')
@@ -0,0 +1,45 @@
+"""Version carts and their lines for delta sync
+
+Revision ID: e7a3b5c2d914
+Revises: d4c1e8f09b27
+Create Date: 2026-10-18 05:47:03.114628
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a3b5c2d914'
+down_revision = 'd4c1e8f09b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('carts') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('cart_items') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+    op.create_table('cart_item_removals',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('cart_id', sa.UUID(), nullable=False),
+    sa.Column('artwork_id', sa.UUID(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artwork_id'], ['artworks.id'], ),
+    sa.ForeignKeyConstraint(['cart_id'], ['carts.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cart_id', 'artwork_id', name='uq_cart_item_removals_cart_artwork')
+    )
+
+
+def downgrade():
+    op.drop_table('cart_item_removals')
+
+    with op.batch_alter_table('cart_items') as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('carts') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,37 @@
+"""Outbox for order and sign-up side effects
+
+Revision ID: f2b8d61c3a05
+Revises: e7a3b5c2d914
+Create Date: 2026-10-18 06:31:25.740193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d61c3a05'
+down_revision = 'e7a3b5c2d914'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_messages',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('topic', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_messages_status_available', 'outbox_messages', ['status', 'available_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_outbox_messages_status_available', table_name='outbox_messages')
+    op.drop_table('outbox_messages')
@@ -0,0 +1,58 @@
+"""Artwork full-text search index
+
+Revision ID: f5eb63daf6dd
+Revises: 9cf2b9a75342
+Create Date: 2026-10-18 02:40:12.311842
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5eb63daf6dd'
+down_revision = '9cf2b9a75342'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("""
+            CREATE TABLE artwork_search (
+                artwork_id UUID PRIMARY KEY REFERENCES artworks (id) ON DELETE CASCADE,
+                document TSVECTOR NOT NULL
+            )
+        """)
+        op.execute("CREATE INDEX ix_artwork_search_document ON artwork_search USING GIN (document)")
+        op.execute("""
+            INSERT INTO artwork_search (artwork_id, document)
+            SELECT a.id,
+                   setweight(to_tsvector('simple', coalesce(a.title, '')), 'A') ||
+                   setweight(to_tsvector('simple', coalesce(u.username, '')), 'B') ||
+                   setweight(to_tsvector('simple', coalesce(a.category, '')), 'C') ||
+                   setweight(to_tsvector('simple', coalesce(a.description, '')), 'D')
+            FROM artworks a LEFT JOIN users u ON u.id = a.artist_id
+        """)
+    elif dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE artwork_search USING fts5(
+                artwork_id UNINDEXED, title, description, category, artist, prefix='2 3'
+            )
+        """)
+        op.execute("""
+            INSERT INTO artwork_search (artwork_id, title, description, category, artist)
+            SELECT a.id, coalesce(a.title, ''), coalesce(a.description, ''),
+                   coalesce(a.category, ''), coalesce(u.username, '')
+            FROM artworks a LEFT JOIN users u ON u.id = a.artist_id
+        """)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_artwork_search_document")
+    if dialect in ('postgresql', 'sqlite'):
+        op.execute("DROP TABLE IF EXISTS artwork_search")
@@ -0,0 +1,137 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models.artwork import Artwork
+from app.models.user import User
+from app.utils.cache import gallery_cache
+from app.utils.identity import identity_cache
+
+PASSWORD = 'TestPassw0rd'
+CATEGORIES = ['painting', 'sculpture', 'photography', 'digital']
+
+
+class SuiteConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    PASSWORD_HASH_WORKERS = 0
+    RATE_LIMIT_ENABLED = False
+    BACKGROUND_WORKERS = 0
+    OUTBOX_WORKER = False
+
+
+# Engine-specific tests also run against TEST_DATABASE_URL when it points at
+# a scratch Postgres database (its tables are dropped after every test)
+POSTGRES_URL = os.getenv('TEST_DATABASE_URL')
+ENGINES = [
+    pytest.param('sqlite://', id='sqlite'),
+    pytest.param(POSTGRES_URL, id='postgresql',
+                 marks=pytest.mark.skipif(not POSTGRES_URL, reason='TEST_DATABASE_URL is not set')),
+]
+
+# A SQLite file per test, for tests that hit the database from several threads
+FILE_SQLITE = 'sqlite:///{tmp_path}/suite.db'
+
+
+@pytest.fixture
+def app(request):
+    """The app on in-memory SQLite; parametrize indirectly with ENGINES or FILE_SQLITE for others"""
+    config = SuiteConfig()
+    config.SQLALCHEMY_DATABASE_URI = getattr(request, 'param', SuiteConfig.SQLALCHEMY_DATABASE_URI)
+    if '{tmp_path}' in config.SQLALCHEMY_DATABASE_URI:
+        config.SQLALCHEMY_DATABASE_URI = config.SQLALCHEMY_DATABASE_URI.format(
+            tmp_path=request.getfixturevalue('tmp_path'))
+        # Writers queue on the database lock instead of failing
+        config.SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    # Process-wide caches would otherwise carry rows across databases
+    gallery_cache.clear()
+    identity_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def catalog(app):
+    """Three artists, a collector and 24 available artworks"""
+    artists = [
+        User(username=f'artist{i}', email=f'artist{i}@example.com', full_name=f'Artist {i}', role='artist')
+        for i in range(3)
+    ]
+    collector = User(username='collector', email='collector@example.com', full_name='Collector',
+                     role='collector')
+    for user in artists + [collector]:
+        user.set_password(PASSWORD)
+    db.session.add_all(artists + [collector])
+    db.session.flush()
+
+    base = datetime(2025, 1, 1)
+    artworks = [
+        Artwork(title=f'Blue study {i}' if i % 3 == 0 else f'Piece {i}',
+                description='A sunset over the harbour' if i % 2 else 'Abstract forms',
+                price=Decimal(50 + i * 37 % 900), category=CATEGORIES[i % len(CATEGORIES)],
+                artist_id=artists[i % len(artists)].id, created_at=base + timedelta(hours=i))
+        for i in range(24)
+    ]
+    db.session.add_all(artworks)
+    db.session.commit()
+    return {'artists': artists, 'collector': collector, 'artworks': artworks}
+
+
+@pytest.fixture
+def login(client):
+    def login(email):
+        response = client.post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+        assert response.status_code == 200, response.get_json()
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    return login
+
+
+class QueryLog:
+    def __init__(self):
+        self.executions = []
+
+    @property
+    def statements(self):
+        return [statement for statement, _ in self.executions]
+
+    def __len__(self):
+        return len(self.executions)
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager that records the SQL statements (and parameters) executed inside it"""
+    @contextmanager
+    def count_queries():
+        log = QueryLog()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            log.executions.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield log
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return count_queries
@@ -0,0 +1,128 @@
+"""Cart batch edits, delta sync and conditional writes"""
+
+import pytest
+
+from app.extensions import db
+
+
+@pytest.fixture
+def shopper(client, catalog, login):
+    """Collector headers with artworks 0 and 1 in the cart"""
+    headers = login('collector@example.com')
+    for artwork in catalog['artworks'][:2]:
+        assert client.post('/api/cart', json={'artworkId': str(artwork.id)}, headers=headers).status_code == 201
+    return headers
+
+
+def cart_state(client, headers):
+    body = client.get('/api/cart', headers=headers).get_json()
+    return body['version'], sorted(item['artwork_id'] for item in body['items']), body['item_count']
+
+
+def ids(catalog, *indexes):
+    return [str(catalog['artworks'][i].id) for i in indexes]
+
+
+def test_mixed_batch_applies_as_one_version(client, catalog, shopper):
+    a0, a1, a2, a3 = ids(catalog, 0, 1, 2, 3)
+    version, _, _ = cart_state(client, shopper)
+
+    response = client.post('/api/cart/batch', json={'operations': [
+        {'op': 'add', 'artworkId': a2},
+        {'op': 'remove', 'artworkId': a0},
+        {'op': 'set', 'artworkId': a1, 'quantity': 1},
+        {'op': 'add', 'artworkId': a3},
+        {'op': 'remove', 'artworkId': a3},
+    ]}, headers=shopper)
+    assert response.status_code == 200
+    assert cart_state(client, shopper) == (version + 1, sorted([a1, a2]), 2)
+
+
+@pytest.mark.parametrize('bad', [
+    {'op': 'explode', 'artworkId': 'ignored'},
+    {'op': 'add', 'artworkId': 'not-a-uuid'},
+    {'op': 'set', 'quantity': 2},
+])
+def test_invalid_operation_rejects_the_whole_batch(client, catalog, shopper, bad):
+    a0, a2 = ids(catalog, 0, 2)
+    if 'artworkId' not in bad:
+        bad = {**bad, 'artworkId': a2}
+    before = cart_state(client, shopper)
+
+    response = client.post('/api/cart/batch', json={'operations': [
+        {'op': 'add', 'artworkId': a2},
+        {'op': 'remove', 'artworkId': a0},
+        bad,
+    ]}, headers=shopper)
+    assert response.status_code == 400
+    assert cart_state(client, shopper) == before
+
+
+def test_unavailable_artwork_rolls_back_the_whole_batch(client, catalog, shopper):
+    a0, a2, sold = ids(catalog, 0, 2, 5)
+    catalog['artworks'][5].is_available = False
+    db.session.commit()
+    before = cart_state(client, shopper)
+
+    response = client.post('/api/cart/batch', json={'operations': [
+        {'op': 'remove', 'artworkId': a0},
+        {'op': 'add', 'artworkId': a2},
+        {'op': 'add', 'artworkId': sold},
+    ]}, headers=shopper)
+    assert response.status_code == 404
+    assert response.get_json()['unavailable'] == [sold]
+    assert cart_state(client, shopper) == before
+
+
+def test_since_version_returns_only_changes_and_tombstones(client, catalog, shopper):
+    a0, a1, a2 = ids(catalog, 0, 1, 2)
+    version, _, _ = cart_state(client, shopper)
+
+    assert client.post('/api/cart', json={'artworkId': a2}, headers=shopper).status_code == 201
+    assert client.delete(f'/api/cart/{a0}', headers=shopper).status_code == 200
+
+    response = client.get(f'/api/cart?since_version={version}', headers=shopper)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['since_version'] == version
+    assert body['version'] == version + 2
+    assert [item['artwork_id'] for item in body['items']] == [a2]
+    assert body['removed'] == [a0]
+    assert body['item_count'] == 2
+    assert response.headers['ETag'] == f'"cart-{version + 2}"'
+
+    # Nothing changed since the current version
+    body = client.get(f"/api/cart?since_version={version + 2}", headers=shopper).get_json()
+    assert body['items'] == [] and body['removed'] == []
+
+    # A re-added artwork is a changed line, not a tombstone
+    client.post('/api/cart', json={'artworkId': a0}, headers=shopper)
+    body = client.get(f'/api/cart?since_version={version}', headers=shopper).get_json()
+    assert sorted(item['artwork_id'] for item in body['items']) == sorted([a0, a2])
+    assert body['removed'] == []
+    assert a1 not in [item['artwork_id'] for item in body['items']]
+
+
+def test_stale_if_match_gets_412_with_current_version(client, catalog, shopper):
+    a0, a2 = ids(catalog, 0, 2)
+    version, lines, _ = cart_state(client, shopper)
+    stale = {**shopper, 'If-Match': f'"cart-{version}"'}
+
+    # The first conditional edit wins and moves the version on
+    response = client.post('/api/cart', json={'artworkId': a2}, headers=stale)
+    assert response.status_code == 201
+    assert response.headers['ETag'] == f'"cart-{version + 1}"'
+
+    # Edits still based on the old version lose
+    for method, path, body in (('DELETE', f'/api/cart/{a0}', None),
+                               ('PATCH', f'/api/cart/{a0}', {'quantity': 0}),
+                               ('POST', '/api/cart/batch', {'operations': [{'op': 'remove', 'artworkId': a0}]})):
+        response = client.open(path, method=method, json=body, headers=stale)
+        assert response.status_code == 412
+        assert response.get_json()['version'] == version + 1
+        assert response.headers['ETag'] == f'"cart-{version + 1}"'
+    assert cart_state(client, shopper) == (version + 1, sorted(lines + [a2]), 3)
+
+    # Retrying on the current version succeeds
+    current = {**shopper, 'If-Match': f'"cart-{version + 1}"'}
+    assert client.delete(f'/api/cart/{a0}', headers=current).status_code == 200
@@ -0,0 +1,98 @@
+"""Cart and order placement"""
+
+from app.extensions import db
+from app.models.notification import Notification
+from app.utils.catalog import Catalog
+
+SHIPPING = {'fullName': 'Collector', 'address': '1 Test St', 'city': 'Testville', 'country': 'BE', 'postalCode': '1000'}
+
+
+def order(client, headers, artworks):
+    items = [{'artwork_id': str(artwork.id), 'quantity': 1} for artwork in artworks]
+    return client.post('/api/orders', json={'items': items, 'shipping_details': SHIPPING}, headers=headers)
+
+
+def test_checkout_bumps_catalog_version_last(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    before = Catalog.current().version
+
+    with count_queries() as queries:
+        response = order(client, headers, catalog['artworks'][:2])
+    assert response.status_code == 201
+
+    writes = [statement for statement in queries.statements if not statement.lstrip().startswith('SELECT')]
+    stamps = [i for i, statement in enumerate(writes) if 'catalog_state' in statement]
+    # An UPDATE, plus the INSERT that creates the stamp row on a fresh database
+    assert stamps and stamps[0] == len(writes) - len(stamps)
+    assert Catalog.current().version == before + 1
+
+
+def test_sold_artworks_cannot_be_ordered_again(client, catalog, login):
+    headers = login('collector@example.com')
+    sold = catalog['artworks'][0]
+    assert order(client, headers, [sold]).status_code == 201
+
+    before = Catalog.current().version
+    response = order(client, headers, [catalog['artworks'][1], sold])
+    assert response.status_code == 409
+    assert response.get_json()['unavailable'] == [str(sold.id)]
+    assert Catalog.current().version == before
+    assert client.get(f"/api/gallery/{catalog['artworks'][1].id}").status_code == 200
+
+
+def test_ordering_a_missing_artwork_is_not_found(client, catalog, login):
+    missing = '00000000-0000-4000-8000-000000000000'
+    items = [{'artwork_id': str(catalog['artworks'][0].id), 'quantity': 1}, {'artwork_id': missing, 'quantity': 1}]
+    response = client.post('/api/orders', json={'items': items, 'shipping_details': SHIPPING},
+                           headers=login('collector@example.com'))
+    assert response.status_code == 404
+    assert response.get_json()['unavailable'] == [missing]
+
+
+def test_cart_adding_an_artwork_twice_still_checks_out(client, catalog, login):
+    headers = login('collector@example.com')
+    artwork = catalog['artworks'][0]
+    for _ in range(2):
+        assert client.post('/api/cart', json={'artworkId': str(artwork.id)}, headers=headers).status_code == 201
+
+    summary = client.get('/api/cart/summary', headers=headers).get_json()
+    assert summary['item_count'] == 1
+    assert summary['subtotal'] == float(artwork.price)
+
+    response = client.post('/api/orders/from-cart', json={'shipping_details': SHIPPING}, headers=headers)
+    assert response.status_code == 201
+    assert client.get('/api/cart/summary', headers=headers).get_json()['item_count'] == 0
+
+
+def test_cart_refuses_quantities_above_one(client, catalog, login):
+    headers = login('collector@example.com')
+    artwork_id = str(catalog['artworks'][0].id)
+    assert client.post('/api/cart', json={'artworkId': artwork_id, 'quantity': 2}, headers=headers).status_code == 400
+
+    assert client.post('/api/cart', json={'artworkId': artwork_id}, headers=headers).status_code == 201
+    assert client.patch(f'/api/cart/{artwork_id}', json={'quantity': 2}, headers=headers).status_code == 400
+    batch = {'operations': [{'op': 'set', 'artworkId': artwork_id, 'quantity': 3}]}
+    assert client.post('/api/cart/batch', json=batch, headers=headers).status_code == 400
+    assert client.get('/api/cart/summary', headers=headers).get_json()['item_count'] == 1
+
+
+def test_artwork_write_bumps_catalog_version_in_its_own_commit(catalog):
+    db.session.commit()
+    before = Catalog.current().version
+    artwork = catalog['artworks'][0]
+    artwork.title = 'Retitled'
+    db.session.commit()
+    assert Catalog.current().version == before + 1
+
+    db.session.commit()
+    assert Catalog.current().version == before + 1
+
+
+def test_cart_add_notifies_the_artist_once(client, catalog, login):
+    artwork = catalog['artworks'][0]
+    headers = login('collector@example.com')
+    for _ in range(2):
+        assert client.post('/api/cart', json={'artworkId': str(artwork.id)}, headers=headers).status_code == 201
+
+    notifications = Notification.query.filter_by(user_id=artwork.artist_id, type='cart').all()
+    assert len(notifications) == 1
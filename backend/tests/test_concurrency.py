@@ -0,0 +1,64 @@
+"""Racing writers from several threads against a shared database"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import func, select
+
+from conftest import FILE_SQLITE
+from app.extensions import db
+from app.models.artwork import Artwork
+from app.models.cart import CartItem
+from app.models.order import OrderItem
+
+pytestmark = pytest.mark.parametrize('app', [FILE_SQLITE], indirect=True)
+
+THREADS = 8
+
+
+def race(app, requests):
+    """Send `(method, path, json, headers)` requests from THREADS threads; returns their status codes"""
+    def send(request):
+        method, path, body, headers = request
+        return app.test_client().open(path, method=method, json=body, headers=headers).status_code
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        return list(pool.map(send, requests))
+
+
+def test_concurrent_adds_leave_one_line_per_artwork(app, catalog, login):
+    emails = ['collector@example.com'] + [artist.email for artist in catalog['artists']]
+    carts = [login(email) for email in emails]
+    artwork_ids = [str(artwork.id) for artwork in catalog['artworks'][:6]]
+
+    rng = random.Random(16)
+    attempts = [(rng.randrange(len(carts)), rng.choice(artwork_ids)) for _ in range(120)]
+    statuses = race(app, [
+        ('POST', '/api/cart', {'artworkId': artwork_id}, carts[cart]) for cart, artwork_id in attempts
+    ])
+    assert set(statuses) == {201}
+
+    db.session.remove()
+    lines = db.session.execute(select(CartItem.cart_id, CartItem.artwork_id, CartItem.quantity)).all()
+    assert len(lines) == len(set(attempts))
+    assert len({(line.cart_id, line.artwork_id) for line in lines}) == len(lines)
+    assert {line.quantity for line in lines} == {1}
+    assert db.session.execute(select(func.count(func.distinct(CartItem.cart_id)))).scalar() == \
+        len({cart for cart, _ in attempts})
+
+
+def test_concurrent_checkouts_sell_an_artwork_once(app, catalog, login):
+    headers = login('collector@example.com')
+    artwork = catalog['artworks'][0]
+    shipping = {'fullName': 'Collector', 'address': '1 Test St', 'city': 'Testville', 'country': 'BE',
+                'postalCode': '1000'}
+    body = {'items': [{'artwork_id': str(artwork.id), 'quantity': 1}], 'shipping_details': shipping}
+
+    statuses = race(app, [('POST', '/api/orders', body, headers)] * 24)
+    assert statuses.count(201) == 1
+    assert set(statuses) == {201, 409}
+
+    db.session.remove()
+    assert db.session.execute(select(func.count()).where(OrderItem.artwork_id == artwork.id)).scalar() == 1
+    assert db.session.get(Artwork, artwork.id).is_available is False
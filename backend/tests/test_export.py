@@ -0,0 +1,32 @@
+"""Catalog export for partner syncs"""
+
+import json
+from datetime import datetime, timedelta
+
+from app.extensions import db
+
+
+def export(client, **params):
+    response = client.get('/api/gallery/export', query_string=params)
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_incremental_export_reports_sold_artworks(client, catalog):
+    sold = catalog['artworks'][0]
+    since = datetime.utcnow() - timedelta(seconds=1)
+    sold.is_available = False
+    db.session.commit()
+
+    full = export(client)
+    assert str(sold.id) not in {row['id'] for row in full}
+    assert all(row['is_available'] for row in full)
+
+    changed = {row['id']: row for row in export(client, updated_since=since.isoformat())}
+    assert changed[str(sold.id)]['is_available'] is False
+
+
+def test_export_orders_rows_by_change_time(client, catalog):
+    rows = export(client)
+    assert len(rows) == len(catalog['artworks'])
+    assert [row['updated_at'] for row in rows] == sorted(row['updated_at'] for row in rows)
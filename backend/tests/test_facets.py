@@ -0,0 +1,63 @@
+"""Gallery facets against the listing they summarize"""
+
+from urllib.parse import urlencode
+
+import pytest
+
+from app.utils.artwork_listing import PRICE_BUCKETS
+
+
+def listed(client, **params):
+    response = client.get('/api/gallery/?' + urlencode({'per_page': 100, **params}))
+    assert response.status_code == 200
+    return response.get_json()['items']
+
+
+def bucket_of(price):
+    return max(i for i, low in enumerate(PRICE_BUCKETS) if price >= low)
+
+
+@pytest.mark.parametrize('filters', [
+    {},
+    {'category': 'painting'},
+    {'minPrice': 300, 'maxPrice': 800},
+    {'category': 'sculpture', 'minPrice': 300},
+    {'category': 'painting', 'maxPrice': 700, 'search': 'sunset'},
+])
+def test_facet_counts_match_the_listing(client, catalog, filters):
+    response = client.get('/api/gallery/facets?' + urlencode(filters))
+    assert response.status_code == 200
+    facets = response.get_json()
+
+    items = listed(client, **filters)
+    assert facets['total'] == len(items)
+    if items:
+        assert facets['min_price'] == min(item['price'] for item in items)
+        assert facets['max_price'] == max(item['price'] for item in items)
+
+    # Category counts keep every filter but the category
+    without_category = {key: value for key, value in filters.items() if key != 'category'}
+    expected = {}
+    for item in listed(client, **without_category):
+        expected[item['category']] = expected.get(item['category'], 0) + 1
+    assert {entry['category']: entry['count'] for entry in facets['categories']} == expected
+
+    # Price buckets keep every filter but the price range
+    without_price = {key: value for key, value in filters.items() if key not in ('minPrice', 'maxPrice')}
+    expected = [0] * len(PRICE_BUCKETS)
+    for item in listed(client, **without_price):
+        expected[bucket_of(item['price'])] += 1
+    assert [bucket['count'] for bucket in facets['price_buckets']] == expected
+
+
+def test_each_facet_ignores_its_own_filter(client, catalog):
+    facets = client.get('/api/gallery/facets?category=painting&minPrice=300&maxPrice=600').get_json()
+
+    # Other categories stay selectable, with counts inside the price range
+    categories = {entry['category'] for entry in facets['categories']}
+    assert 'painting' in categories and len(categories) > 1
+
+    # Buckets outside the selected range still count paintings
+    outside = [bucket['count'] for bucket in facets['price_buckets'] if bucket['min'] < 250 or bucket['min'] >= 1000]
+    assert sum(outside) > 0
+    assert facets['total'] == len(listed(client, category='painting', minPrice=300, maxPrice=600))
@@ -0,0 +1,51 @@
+"""Gallery multi-get by `?ids=`"""
+
+from app.extensions import db
+from app.utils.artwork_listing import MAX_BATCH_IDS
+
+MISSING = '00000000-0000-4000-8000-000000000000'
+
+
+def get_ids(client, *ids):
+    return client.get('/api/gallery/?ids=' + ','.join(ids))
+
+
+def test_ids_keep_request_order(client, catalog):
+    artworks = catalog['artworks']
+    requested = [str(artworks[i].id) for i in (5, 0, 17, 3)]
+
+    response = get_ids(client, *requested)
+    assert response.status_code == 200
+    items = response.get_json()['items']
+    assert [item['id'] for item in items] == requested
+    assert [item['artwork']['id'] for item in items] == requested
+    assert {item['status'] for item in items} == {'ok'}
+    assert items[0]['artwork']['artist'] == artworks[5].artist.username
+
+
+def test_ids_report_status_per_item(client, catalog):
+    artworks = catalog['artworks']
+    artworks[1].is_available = False
+    db.session.commit()
+
+    response = get_ids(client, str(artworks[0].id), MISSING, 'not-a-uuid', str(artworks[1].id))
+    assert response.status_code == 200
+    items = response.get_json()['items']
+    assert [(item['id'], item['status']) for item in items] == [
+        (str(artworks[0].id), 'ok'),
+        (MISSING, 'not_found'),
+        ('not-a-uuid', 'invalid'),
+        (str(artworks[1].id), 'unavailable'),
+    ]
+    assert all('artwork' not in item for item in items[1:])
+
+
+def test_ids_are_capped(client, catalog):
+    ids = [MISSING] * MAX_BATCH_IDS
+    assert get_ids(client, *ids).status_code == 200
+
+    response = get_ids(client, *ids, MISSING)
+    assert response.status_code == 400
+    assert str(MAX_BATCH_IDS) in response.get_json()['message']
+
+    assert client.get('/api/gallery/?ids=,').status_code == 400
@@ -0,0 +1,43 @@
+"""Conditional requests against gallery artwork detail"""
+
+from app.extensions import db
+
+
+def test_artwork_detail_revalidates(client, catalog):
+    url = f"/api/gallery/{catalog['artworks'][0].id}"
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': response.headers['Last-Modified']}).status_code == 304
+
+
+def test_artist_rename_changes_artwork_etag(client, catalog):
+    artwork = catalog['artworks'][0]
+    url = f'/api/gallery/{artwork.id}'
+    etag = client.get(url).headers['ETag']
+
+    artwork.artist.username = 'renamed'
+    db.session.commit()
+
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['artist'] == 'renamed'
+    assert response.headers['ETag'] != etag
+
+
+def test_artist_rename_changes_list_and_ids_etags(client, catalog):
+    artwork = catalog['artworks'][0]
+    urls = ['/api/gallery/?per_page=24', f'/api/gallery/?ids={artwork.id}']
+    etags = [client.get(url).headers['ETag'] for url in urls]
+
+    artwork.artist.username = 'renamed'
+    db.session.commit()
+
+    for url, etag in zip(urls, etags):
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    body = client.get(urls[0]).get_json()
+    assert 'renamed' in {item['artist'] for item in body['items']}
@@ -0,0 +1,42 @@
+"""Identities behind tokens issued before the user changed"""
+
+from flask_jwt_extended import verify_jwt_in_request
+
+from app.extensions import db
+from app.utils.identity import current_identity
+
+
+def identity_for(app, headers):
+    with app.test_request_context(headers=headers):
+        verify_jwt_in_request()
+        return current_identity()
+
+
+def test_deactivation_applies_to_issued_tokens(app, catalog, login):
+    headers = login('artist0@example.com')
+    assert identity_for(app, headers).is_active
+
+    catalog['artists'][0].is_active = False
+    db.session.commit()
+
+    assert not identity_for(app, headers).is_active
+
+
+def test_demotion_applies_to_issued_tokens(app, catalog, login):
+    headers = login('artist0@example.com')
+    assert identity_for(app, headers).role == 'artist'
+
+    catalog['artists'][0].role = 'collector'
+    db.session.commit()
+
+    assert identity_for(app, headers).role == 'collector'
+
+
+def test_trusted_claims_outlive_role_changes(app, catalog, login):
+    app.config['JWT_TRUST_IDENTITY_CLAIMS'] = True
+    headers = login('artist0@example.com')
+
+    catalog['artists'][0].role = 'collector'
+    db.session.commit()
+
+    assert identity_for(app, headers).role == 'artist'
@@ -0,0 +1,67 @@
+"""Every query a hot route runs is answered through an index, not a full table scan"""
+
+import re
+
+import pytest
+
+from conftest import ENGINES
+from app.extensions import db
+
+pytestmark = pytest.mark.parametrize('app', ENGINES, indirect=True)
+
+SHIPPING = {'fullName': 'Collector', 'address': '1 Test St', 'city': 'Testville', 'country': 'BE', 'postalCode': '1000'}
+
+
+def full_scans(statement, parameters):
+    """Plan lines of `statement` that read a whole table"""
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        # The test tables are small enough that a sequential scan always
+        # wins on cost; disabling it shows whether an index can be used
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        plan = [row[0] for row in connection.exec_driver_sql('EXPLAIN ' + statement, parameters)]
+        return [line.strip() for line in plan if 'Seq Scan' in line]
+    plan = [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+    return [line for line in plan if re.fullmatch(r'SCAN \w+', line)]
+
+
+@pytest.fixture
+def shopper(client, catalog, login):
+    """A collector with cart lines, wishlist items, an order and its notification; returns the order id"""
+    headers = login('collector@example.com')
+    artwork_ids = [str(artwork.id) for artwork in catalog['artworks'][:3]]
+    for artwork_id in artwork_ids[1:]:
+        assert client.post('/api/cart', json={'artworkId': artwork_id}, headers=headers).status_code == 201
+        assert client.post('/api/wishlist', json={'artworkId': artwork_id}, headers=headers).status_code == 201
+    response = client.post('/api/orders', json={
+        'items': [{'artwork_id': artwork_ids[0], 'quantity': 1}], 'shipping_details': SHIPPING
+    }, headers=headers)
+    assert response.status_code == 201
+    client.put(f"/api/orders/{response.get_json()['id']}", json={'status': 'confirmed'}, headers=headers)
+    return response.get_json()['id']
+
+
+@pytest.mark.parametrize('path, user', [
+    ('/api/gallery/?per_page=12', None),
+    ('/api/gallery/?sort=price-low', None),
+    ('/api/gallery/?category=painting&minPrice=100', None),
+    ('/api/gallery/?cursor=', None),
+    ('/api/cart', 'collector@example.com'),
+    ('/api/wishlist', 'collector@example.com'),
+    ('/api/collectors/notifications', 'collector@example.com'),
+    ('/api/collectors/notifications?cursor=', 'collector@example.com'),
+    ('/api/orders', 'collector@example.com'),
+    ('/api/orders/{order_id}', 'collector@example.com'),
+    ('/api/orders', 'artist0@example.com'),
+])
+def test_route_queries_use_indexes(client, login, shopper, count_queries, path, user):
+    headers = login(user) if user else None
+    with count_queries() as queries:
+        response = client.get(path.format(order_id=shopper), headers=headers)
+    assert response.status_code == 200, response.get_json()
+
+    reads = [(statement, parameters) for statement, parameters in queries.executions
+             if statement.lstrip().upper().startswith('SELECT')]
+    assert reads
+    for statement, parameters in reads:
+        assert full_scans(statement, parameters) == [], statement
@@ -0,0 +1,60 @@
+"""Outbox delivery"""
+
+import time
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models.notification import Notification
+from app.models.outbox import OutboxMessage
+from app.models.user import User
+from app.utils.outbox import outbox
+
+from conftest import SuiteConfig
+
+
+@pytest.fixture
+def worker_app(tmp_path):
+    class WorkerConfig(SuiteConfig):
+        # The dispatcher thread needs its own connection
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'outbox.db'}"
+        OUTBOX_WORKER = True
+        OUTBOX_POLL_INTERVAL = 0.05
+
+    app = create_app(WorkerConfig())
+    with app.app_context():
+        db.create_all()
+        yield app
+        outbox.shutdown()
+        db.session.remove()
+        db.drop_all()
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_backlog_drains_on_first_request(worker_app):
+    # A message a previous process committed but never delivered
+    user = User(username='newcomer', email='newcomer@example.com', full_name='Newcomer', role='collector',
+                password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(OutboxMessage(topic='user.welcome', payload={'user_id': str(user.id), 'role': 'collector'}))
+    db.session.commit()
+    user_id = user.id
+    assert outbox._thread is None
+
+    assert worker_app.test_client().get('/health').status_code == 200
+
+    def delivered():
+        db.session.remove()
+        return db.session.query(OutboxMessage.status).scalar() == 'sent'
+    assert wait_for(delivered)
+    assert Notification.query.filter_by(user_id=user_id).count() == 1
@@ -0,0 +1,173 @@
+"""Statement counts for the hot read endpoints, to catch N+1 regressions"""
+
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models.artwork import Artwork
+
+
+@pytest.fixture
+def large_catalog(catalog):
+    """The catalog grown to 124 artworks, so a 100-item page is full"""
+    artists = catalog['artists']
+    db.session.add_all([
+        Artwork(title=f'Extra {i}', price=Decimal(20 + i), category='digital', artist_id=artists[i % len(artists)].id)
+        for i in range(100)
+    ])
+    db.session.commit()
+    return catalog
+
+
+@pytest.mark.parametrize('per_page', [12, 100])
+def test_gallery_page_loads_artists_and_total_in_one_query(client, large_catalog, count_queries, per_page):
+    with count_queries() as queries:
+        response = client.get(f'/api/gallery/?per_page={per_page}')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['items']) == per_page
+    assert body['total'] == 124
+    assert all(item['artist'] for item in body['items'])
+    # Catalog version for the ETag, then the page with artists and the total
+    assert len(queries) == 2
+
+
+SHIPPING = {'fullName': 'Collector', 'address': '1 Test St', 'city': 'Testville', 'country': 'BE', 'postalCode': '1000'}
+
+
+def add_to_cart(client, headers, artworks):
+    for artwork in artworks:
+        response = client.post('/api/cart', json={'artworkId': str(artwork.id)}, headers=headers)
+        assert response.status_code == 201, response.get_json()
+
+
+def place_orders(client, headers, artworks, lines_per_order):
+    orders = []
+    for start in range(0, len(artworks), lines_per_order):
+        items = [{'artwork_id': str(artwork.id), 'quantity': 1} for artwork in artworks[start:start + lines_per_order]]
+        response = client.post('/api/orders', json={'items': items, 'shipping_details': SHIPPING}, headers=headers)
+        assert response.status_code == 201, response.get_json()
+        orders.append(response.get_json()['id'])
+    return orders
+
+
+def test_cart_queries_do_not_grow_with_lines(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    counts = []
+    for artworks in (catalog['artworks'][:1], catalog['artworks'][1:6]):
+        add_to_cart(client, headers, artworks)
+        with count_queries() as queries:
+            response = client.get('/api/cart', headers=headers)
+        assert response.status_code == 200
+        counts.append(len(queries))
+    assert len(response.get_json()['items']) == 6
+    # Version check, cart, its lines, then every line's artwork in one batch
+    assert counts == [4, 4]
+
+
+def test_cart_summary_reads_one_row(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    add_to_cart(client, headers, catalog['artworks'][:3])
+    with count_queries() as queries:
+        response = client.get('/api/cart/summary', headers=headers)
+    assert response.get_json()['item_count'] == 3
+    assert len(queries) == 1
+
+
+def test_order_queries_do_not_grow_with_orders(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    artworks = catalog['artworks']
+    client.get('/api/orders', headers=headers)  # resolve the identity once
+
+    counts = []
+    for batch in (artworks[:3], artworks[3:12]):
+        place_orders(client, headers, batch, 3)
+        with count_queries() as queries:
+            response = client.get('/api/orders', headers=headers)
+        assert response.status_code == 200
+        counts.append(len(queries))
+    assert len(response.get_json()['items']) == 4
+    # Orders, their items, payments and deliveries, the total, then artworks
+    assert counts == [6, 6]
+
+
+def test_order_detail_loads_in_fixed_queries(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    order_id, = place_orders(client, headers, catalog['artworks'][:5], 5)
+    client.get('/api/orders', headers=headers)  # resolve the identity once
+
+    with count_queries() as queries:
+        response = client.get(f'/api/orders/{order_id}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 5
+    assert len(queries) == 5
+
+
+def test_order_status_update_loads_in_fixed_queries(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    order_ids = place_orders(client, headers, catalog['artworks'][:6], 5)
+    client.get('/api/orders', headers=headers)  # resolve the identity once
+
+    counts = []
+    for order_id in order_ids:
+        with count_queries() as queries:
+            response = client.put(f'/api/orders/{order_id}', json={'status': 'confirmed'}, headers=headers)
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'confirmed'
+        counts.append(len(queries))
+    # Order, items, payments, deliveries, line artworks, then the UPDATE and
+    # the customer's notification in one transaction
+    assert counts == [7, 7]
+
+
+def test_artist_order_list_has_one_row_per_order(client, catalog, login, count_queries):
+    artworks = catalog['artworks']
+    collector = login('collector@example.com')
+    artist = login('artist0@example.com')
+    client.get('/api/orders', headers=artist)  # resolve the identity once
+
+    # Artworks 0, 3, 6 and 9 belong to the same artist, 1 and 4 to another
+    counts = []
+    for batch, expected in (([artworks[0], artworks[3], artworks[1]], 1),
+                            ([artworks[6], artworks[9], artworks[4]], 2)):
+        place_orders(client, collector, batch, 3)
+        with count_queries() as queries:
+            response = client.get('/api/orders', headers=artist)
+        assert response.status_code == 200
+        body = response.get_json()
+        assert len(body['items']) == expected
+        assert body['pagination']['total'] == expected
+        counts.append(len(queries))
+    # Orders, their items, payments and deliveries, the total, then artworks
+    assert counts == [6, 6]
+
+
+def test_wishlist_queries_do_not_grow_with_items(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    artwork_ids = [str(artwork.id) for artwork in catalog['artworks'][:6]]
+
+    posts, gets = [], []
+    for batch in (artwork_ids[:1], artwork_ids[1:]):
+        for artwork_id in batch:
+            with count_queries() as queries:
+                response = client.post('/api/wishlist', json={'artworkId': artwork_id}, headers=headers)
+            assert response.status_code == 201
+            posts.append(len(queries))
+        with count_queries() as queries:
+            response = client.get('/api/wishlist', headers=headers)
+        assert response.status_code == 200
+        gets.append(len(queries))
+    assert len(response.get_json()['items']) == 6
+    # Wishlist, its items, then every item's artwork in one batch
+    assert gets == [3, 3]
+    # Artwork, wishlist, duplicate check, two inserts, then the response read;
+    # the first add also creates the wishlist
+    assert posts == [10] + [8] * 5
+
+    with count_queries() as queries:
+        response = client.delete(f'/api/wishlist/{artwork_ids[0]}', headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()['items']) == 5
+    # Wishlist, line, the delete, then the response read
+    assert len(queries) == 6
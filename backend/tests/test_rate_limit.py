@@ -0,0 +1,67 @@
+"""Login admission control"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import PASSWORD
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBackend, RateLimit, rate_limiter
+
+WINDOW = 60
+
+
+@pytest.fixture
+def clock(app, monkeypatch):
+    """Enable the limiter with small limits on a clock the test moves by hand"""
+    now = SimpleNamespace(value=1_000_000.0)
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(time=lambda: now.value))
+    rate_limiter.configure(backend=MemoryBackend(), enabled=True, rules={
+        'login': {'email': RateLimit(3, WINDOW), 'ip': RateLimit(5, WINDOW)},
+    })
+    yield now
+    rate_limiter.configure(backend=MemoryBackend(), enabled=False)
+
+
+def login(client, email, password='wrong-password', ip='203.0.113.7'):
+    return client.post('/api/auth/login', json={'email': email, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip})
+
+
+def test_attempts_over_the_limit_get_429_with_retry_after(client, catalog, clock):
+    assert [login(client, 'collector@example.com').status_code for _ in range(3)] == [401] * 3
+
+    response = login(client, 'collector@example.com')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(WINDOW)
+
+    # Refused attempts do not count, and the wait shrinks as time passes
+    clock.value += 20
+    response = login(client, 'collector@example.com', password=PASSWORD)
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(WINDOW - 20)
+
+
+def test_limit_resets_after_the_window(client, catalog, clock):
+    for _ in range(3):
+        login(client, 'collector@example.com')
+    assert login(client, 'collector@example.com').status_code == 429
+
+    clock.value += WINDOW
+    assert login(client, 'collector@example.com').status_code == 401
+    assert login(client, 'collector@example.com', password=PASSWORD).status_code == 200
+
+
+def test_ip_limit_spans_accounts(client, catalog, clock):
+    emails = ['collector@example.com', 'artist0@example.com', 'artist1@example.com']
+    statuses = [login(client, emails[i % 3]).status_code for i in range(5)]
+    assert statuses == [401] * 5
+    assert login(client, 'artist2@example.com').status_code == 429
+    assert login(client, 'artist2@example.com', ip='198.51.100.1').status_code == 401
+
+
+def test_successful_login_clears_account_failures(client, catalog, clock):
+    for _ in range(2):
+        login(client, 'collector@example.com')
+    assert login(client, 'collector@example.com', password=PASSWORD).status_code == 200
+    assert [login(client, 'collector@example.com').status_code for _ in range(2)] == [401] * 2
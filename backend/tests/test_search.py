@@ -0,0 +1,43 @@
+"""Full-text gallery search against the ILIKE filter it replaced"""
+
+import pytest
+
+from conftest import ENGINES
+from app.extensions import db
+from app.models.artwork import Artwork
+from app.utils.artwork_listing import ArtworkFilters, apply_artwork_filters
+from app.utils.search import ArtworkSearch
+
+# FTS5 on SQLite, the tsvector index on Postgres when TEST_DATABASE_URL is set
+pytestmark = pytest.mark.parametrize('app', ENGINES, indirect=True)
+
+
+def matching_ids(search):
+    filters = ArtworkFilters(category=None, search=search, min_price=None, max_price=None)
+    query, _ = apply_artwork_filters(Artwork.query.filter_by(is_available=True), filters)
+    return {artwork.id for artwork in query}
+
+
+# Whole words and word prefixes found in titles and descriptions, where both
+# paths must agree. The index also covers artist and category, which ILIKE
+# never searched, so those terms are left out.
+@pytest.mark.parametrize('search', ['blue', 'sunset', 'abstr', 'harbour', 'study', 'piece 1', 'sunset over'])
+def test_full_text_search_matches_ilike(catalog, monkeypatch, search):
+    assert ArtworkSearch.match(search) is not None
+    indexed = matching_ids(search)
+
+    monkeypatch.setattr(ArtworkSearch, 'match', staticmethod(lambda search: None))
+    fallback = matching_ids(search)
+
+    assert fallback
+    assert indexed == fallback
+
+
+def test_index_follows_artwork_updates(catalog):
+    artwork = catalog['artworks'][1]
+    assert artwork.id not in matching_ids('lighthouse')
+
+    artwork.title = 'Lighthouse at dusk'
+    db.session.commit()
+
+    assert artwork.id in matching_ids('lighthouse')
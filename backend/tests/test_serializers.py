@@ -0,0 +1,63 @@
+"""The hand-written serializers produce exactly what the marshmallow schemas dump"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.extensions import db
+from app.models.artwork import ArtworkSchema
+from app.models.cart import Cart, CartItem, CartSchema
+from app.models.delivery import Delivery
+from app.models.order import Order, OrderItem, OrderSchema
+from app.models.payment import Payment
+from app.utils.serializers import serialize_artwork, serialize_order, serialize_cart
+
+
+@pytest.fixture
+def artworks(catalog):
+    # Cover the optional fields both ways
+    catalog['artworks'][1].description = None
+    catalog['artworks'][2].image_url = 'https://example.com/2.jpg'
+    db.session.commit()
+    return catalog['artworks']
+
+
+def test_serialize_artwork_matches_schema(artworks):
+    expected = ArtworkSchema(many=True).dump(artworks)
+    for artwork, item in zip(artworks, expected):
+        item['artist'] = artwork.artist.username
+
+    assert [serialize_artwork(artwork, artwork.artist.username) for artwork in artworks] == expected
+
+
+def test_serialize_order_matches_schema(catalog, artworks):
+    orders = []
+    for i in range(3):
+        order = Order(
+            customer_id=catalog['collector'].id,
+            total_amount=Decimal('250.00'),
+            shipping_address='1 Gallery Road',
+            shipping_city='Nairobi',
+            shipping_country='Kenya',
+            shipping_postal_code='00100',
+            items=[OrderItem(artwork_id=artworks[2 * i + j].id, quantity=1, price=Decimal('125.00'))
+                   for j in range(2)]
+        )
+        if i:
+            order.payments.append(Payment(amount=Decimal('250.00'), status='completed', transaction_id=f'pi_{i}'))
+            order.deliveries.append(Delivery(status='pending', estimated_delivery=datetime(2025, 2, 1)))
+        orders.append(order)
+    db.session.add_all(orders)
+    db.session.commit()
+
+    assert [serialize_order(order) for order in orders] == OrderSchema(many=True).dump(orders)
+
+
+def test_serialize_cart_matches_schema(catalog, artworks):
+    cart = Cart(user_id=catalog['collector'].id,
+                items=[CartItem(artwork_id=artwork.id, quantity=1) for artwork in artworks[:5]])
+    db.session.add(cart)
+    db.session.commit()
+
+    assert serialize_cart(cart) == CartSchema().dump(cart)
@@ -0,0 +1,31 @@
+"""Wishlist endpoints"""
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models.wishlist import Wishlist
+
+
+def test_empty_wishlist_reads_without_writing(client, catalog, login, count_queries):
+    headers = login('collector@example.com')
+    with count_queries() as queries:
+        response = client.get('/api/wishlist', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['items'] == []
+    assert not [statement for statement in queries.statements if not statement.lstrip().startswith('SELECT')]
+    assert db.session.execute(select(func.count()).select_from(Wishlist)).scalar() == 0
+
+
+def test_wishlist_add_and_remove(client, catalog, login):
+    headers = login('collector@example.com')
+    artwork_id = str(catalog['artworks'][0].id)
+
+    response = client.post('/api/wishlist', json={'artworkId': artwork_id}, headers=headers)
+    assert response.status_code == 201
+    assert [item['artwork_id'] for item in response.get_json()['items']] == [artwork_id]
+    assert client.post('/api/wishlist', json={'artworkId': artwork_id}, headers=headers).status_code == 400
+
+    response = client.delete(f'/api/wishlist/{artwork_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['items'] == []
+    assert client.delete('/api/wishlist/not-a-uuid', headers=headers).status_code == 400